@@ -12,7 +12,7 @@ POST  /sessions/{id}/start       (Re-)initialise a session with a scenario
 POST  /sessions/{id}/step        Advance one tick (accepts UserInput)
 POST  /sessions/{id}/reset       Reset to initial state
 GET   /sessions/{id}/state       Current SystemState as JSON
-GET   /sessions/{id}/history     All past StateSnapshots
+GET   /sessions/{id}/history     Recent StateSnapshots (?since=<time_step>)
 GET   /sessions/{id}/rules       Summary of loaded rules (debug / UI)
 
 GET   /health                    Liveness probe
@@ -20,29 +20,96 @@ GET   /health                    Liveness probe
 Run with:
     cd backend
     uvicorn api:app --host 0.0.0.0 --port 8000 --reload
+
+Deployment (uvloop event loop + httptools parser, both from uvicorn[standard]):
+    uvicorn api:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools \
+        --limit-concurrency 1000 --timeout-keep-alive 30
+
+or simply ``python api.py``.  Sessions live in process memory, so keep a
+single worker unless the proxy in front routes each session_id to the
+same worker (e.g. nginx ``hash $session_id consistent`` upstream); only
+then raise ``--workers`` / API_WORKERS towards the number of cores.
+
+SESSION_MAX (default 1000) caps the number of live sessions, least recently
+used evicted first; SESSION_TTL_SECONDS (default 3600) expires idle ones.
+SESSION_LOG_LEVEL (e.g. ``WARNING``) quiets the per-session lifecycle logs.
+
+CORS_ALLOW_ORIGINS (comma-separated, default ``*``) sets the allowed origins.
+Set it to an empty string when a reverse proxy already adds the
+Access-Control-* headers, and the in-process CORS middleware is skipped.
+
+Add middleware only as pure ASGI (receive/send callables), never by
+subclassing BaseHTTPMiddleware: it re-wraps every request and response in
+extra tasks and streams, and startup refuses to run with one installed.
 """
 
-import json
+import asyncio
 import logging
+import os
 import re
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from datetime import datetime, timezone
+from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 # from fastapi import FastAPI, HTTPException, Path, Body
-from fastapi import FastAPI, HTTPException, Path as ApiPath, Body
+from fastapi import FastAPI, HTTPException, Path as ApiPath, Body, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+import orjson
 from pydantic import BaseModel
+from starlette.middleware.base import BaseHTTPMiddleware
 
+from models.explanation import Explanation
 from models.input import UserInput
-from models.state import SystemState, StateSnapshot
-from session import SessionManager, SCENARIO_FACTORIES
+from models.state import StateSnapshot
+from session import (
+    MAX_SESSIONS,
+    SCENARIO_FACTORIES,
+    SESSION_TTL_SECONDS,
+    Session,
+    SessionManager,
+    SnapshotMemo,
+    resolve_scenario,
+)
 
 # ---------------------------------------------------------------------------
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("API")
 
+# How often idle sessions are swept (see SessionManager.evict_expired)
+SESSION_SWEEP_INTERVAL_SECONDS = 60.0
+
+
+async def _sweep_sessions() -> None:
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+        sessions.evict_expired()
+
+
+def _check_middleware(app: FastAPI) -> None:
+    """Refuse to start with BaseHTTPMiddleware-style middleware installed."""
+    for m in app.user_middleware:
+        if isinstance(m.cls, type) and issubclass(m.cls, BaseHTTPMiddleware):
+            raise RuntimeError(
+                f"{m.cls.__name__} subclasses BaseHTTPMiddleware; "
+                "add middleware as pure ASGI instead"
+            )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _check_middleware(app)
+    sweeper = asyncio.create_task(_sweep_sessions())
+    try:
+        yield
+    finally:
+        sweeper.cancel()
+
+
 app = FastAPI(
     title="Vancouver Maritime Museum — Simulation API",
     description=(
@@ -51,25 +118,50 @@ app = FastAPI(
         "for consumption by a Unity frontend."
     ),
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# Allow Unity (localhost) and any development origin
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# Allow Unity (localhost) and any development origin, unless CORS is
+# handled by the reverse proxy (CORS_ALLOW_ORIGINS="")
+CORS_ALLOW_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ALLOW_ORIGINS", "*").split(",")
+    if origin.strip()
+]
+if CORS_ALLOW_ORIGINS:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ALLOW_ORIGINS,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+# /history and /step carry large, repetitive JSON (snapshots, full state)
+app.add_middleware(GZipMiddleware, minimum_size=1000, compresslevel=5)
 
-sessions = SessionManager()
+sessions = SessionManager(
+    max_size=int(os.getenv("SESSION_MAX", str(MAX_SESSIONS))),
+    ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", str(SESSION_TTL_SECONDS))),
+)
 
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(parents=True, exist_ok=True)
 DECISION_LOG_FILE = LOG_DIR / "decision_log.jsonl"
 
+_WS_RE = re.compile(r"\s+")
+
+# Snapshots dumped and encoded per chunk when streaming /history
+HISTORY_STREAM_CHUNK = 64
+_SNAPSHOT_SERIALIZER = StateSnapshot.__pydantic_serializer__
+
 
 # ---------------------------------------------------------------------------
 # Request / Response schemas
+#
+# Response models document the payloads in OpenAPI (via ``responses=``) but
+# are not used as ``response_model``: handlers return plain dicts built from
+# already-validated engine models, so FastAPI would only validate them twice.
 # ---------------------------------------------------------------------------
 
 class CreateSessionRequest(BaseModel):
@@ -144,85 +236,131 @@ class HistoryResponse(BaseModel):
 
 def _clean(text: Any) -> Any:
     """Strip literal newlines / control characters from strings so JSON stays valid."""
-    if isinstance(text, str):
-        # Collapse any whitespace sequence (including \n, \r, \t) to a single space
-        return re.sub(r"\s+", " ", text).strip()
-    return text
-
-
-def _explanation_to_out(exp) -> ExplanationOut:
-    conditions_out = [
-        ConditionEvaluationOut(
-            field=ce.condition.left,
-            operator=ce.condition.operator.value
-            if hasattr(ce.condition.operator, "value")
-            else str(ce.condition.operator),
-            threshold=ce.condition.right,
-            actual_value=ce.left_value,
-            result=ce.result,
-            message=ce.message,
-        )
-        for ce in exp.conditions_evaluated
-    ]
-
-    actions_out = [
-        {
-            "type": aa.action.type.value
-            if hasattr(aa.action.type, "value")
-            else str(aa.action.type),
-            "target": aa.action.target,
+    if not isinstance(text, str):
+        return text
+    # Fast path: already single-spaced with no padding (the same test as
+    # Rule.template_clean; str.split() splits on exactly what \s matches)
+    if text == " ".join(text.split()):
+        return text
+    # Collapse any whitespace sequence (including \n, \r, \t) to a single space
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _enum_value(value: Any) -> str:
+    return value.value if isinstance(value, Enum) else str(value)
+
+
+def _explanation_to_out(exp) -> Dict[str, Any]:
+    """
+    Flatten an Explanation into the ExplanationOut shape.
+
+    Built as a plain dict: the data comes from already-validated engine
+    models, so constructing response models here would only validate it twice.
+    """
+    conditions_out: List[Dict[str, Any]] = []
+    append = conditions_out.append
+    for ce in exp.conditions_evaluated:
+        c = ce.condition
+        append({
+            "field": c.left,
+            "operator": _enum_value(c.operator),
+            "threshold": c.right,
+            "actual_value": ce.left_value,
+            "result": ce.result,
+            "message": ce.message,
+        })
+
+    actions_out: List[Dict[str, Any]] = []
+    append = actions_out.append
+    for aa in exp.actions_applied:
+        a = aa.action
+        append({
+            "type": _enum_value(a.type),
+            "target": a.target,
             "old_value": aa.target_old_value,
             "new_value": aa.target_new_value,
             "success": aa.success,
             "message": aa.message,
-        }
-        for aa in exp.actions_applied
-    ]
+        })
 
+    # Messages rendered from a pre-folded template are already single-line
+    clean = exp.template_clean
     edu = exp.to_educational_format()
     # Recursively sanitize the educational summary for JSON safety
-    edu["message"] = _clean(edu.get("message", ""))
-
-    return ExplanationOut(
-        rule_id=exp.rule_id,
-        priority=exp.priority,
-        triggered=exp.triggered,
-        timestamp=exp.timestamp,
-        logic_used=exp.logic_used,
-        message=_clean(exp.message),
-        conditions=conditions_out,
-        actions=actions_out,
-        side_effects=exp.side_effects,
-        events_generated=exp.events_generated,
-        triggered_by=exp.triggered_by,
-        triggered_rules=exp.triggered_rules,
-        educational_summary=edu,
-    )
+    if not clean:
+        edu["message"] = _clean(edu.get("message", ""))
+
+    return {
+        "rule_id": exp.rule_id,
+        "priority": exp.priority,
+        "triggered": exp.triggered,
+        "timestamp": exp.timestamp,
+        "logic_used": exp.logic_used,
+        "message": exp.message if clean else _clean(exp.message),
+        "conditions": conditions_out,
+        "actions": actions_out,
+        "side_effects": exp.side_effects,
+        "events_generated": exp.events_generated,
+        "triggered_by": exp.triggered_by,
+        "triggered_rules": exp.triggered_rules,
+        "educational_summary": edu,
+    }
+
+
+async def _stream_history(head: bytes, snapshots: List[StateSnapshot]):
+    """
+    Dump and encode a HistoryResponse body chunk by chunk so long histories
+    are never held in memory as one set of dicts or one JSON document.
+    """
+    yield head
+    for start in range(0, len(snapshots), HISTORY_STREAM_CHUNK):
+        chunk = b",".join(
+            orjson.dumps(_SNAPSHOT_SERIALIZER.to_python(s, mode="json"))
+            for s in snapshots[start:start + HISTORY_STREAM_CHUNK]
+        )
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
+
+
+def _orjson_default(obj: Any) -> Any:
+    """orjson fallback hook: encode engine Explanations in the ExplanationOut shape."""
+    if isinstance(obj, Explanation):
+        return _explanation_to_out(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
 
 
 def _write_decision_log(
     session_id: str,
     scenario: str,
     user_input: UserInput,
-    state_before: SystemState,
-    state_after: SystemState,
-    explanations: List[ExplanationOut],
+    state_before: Dict[str, Any],
+    state_after: Dict[str, Any],
+    explanations_json: bytes,
     rules_triggered: List[str],
 ) -> None:
     record = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "session_id": session_id,
         "scenario": scenario,
-        "time_step": state_after.time_step,
-        "input": user_input.model_dump(),
-        "state_before": state_before.model_dump(),
-        "state_after": state_after.model_dump(),
+        "time_step": state_after["time_step"],
+        "input": asdict(user_input),
+        "state_before": state_before,
+        "state_after": state_after,
         "rules_triggered": rules_triggered,
-        "explanations": [exp.model_dump() for exp in explanations],
     }
+    # Splice in the explanations already encoded for the /step response
+    line = orjson.dumps(record)[:-1] + b',"explanations":' + explanations_json + b"}\n"
+
+    with DECISION_LOG_FILE.open("ab") as f:
+        f.write(line)
 
-    with DECISION_LOG_FILE.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+async def get_session(session_id: str = ApiPath(...)) -> Session:
+    """Resolve the {session_id} path parameter to a live Session, or 404."""
+    try:
+        return sessions.require(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Session {session_id!r} not found")
 
 
 # ---------------------------------------------------------------------------
@@ -230,13 +368,17 @@ def _write_decision_log(
 # ---------------------------------------------------------------------------
 
 @app.get("/health", tags=["meta"])
-def health():
+async def health():
     """Quick liveness check for Unity to verify the server is reachable."""
-    return {"status": "ok", "active_sessions": sessions.active_count}
+    return {
+        "status": "ok",
+        "active_sessions": sessions.active_count,
+        "evicted_sessions": sessions.evicted_count,
+    }
 
 
 @app.get("/scenarios", tags=["meta"])
-def list_scenarios():
+async def list_scenarios():
     """List available scenario names and their descriptions."""
     return {
         "scenarios": {
@@ -252,8 +394,8 @@ def list_scenarios():
 # Session lifecycle
 # ------------------------------------------------------------------
 
-@app.post("/sessions", response_model=CreateSessionResponse, tags=["session"])
-def create_session(body: CreateSessionRequest = Body(default=CreateSessionRequest())):
+@app.post("/sessions", responses={200: {"model": CreateSessionResponse}}, tags=["session"])
+async def create_session(body: CreateSessionRequest = Body(default=CreateSessionRequest())):
     """
     Create a new isolated simulation session.
     Returns a session_id that must be passed to all subsequent calls.
@@ -263,15 +405,15 @@ def create_session(body: CreateSessionRequest = Body(default=CreateSessionReques
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-    return CreateSessionResponse(
-        session_id=session.session_id,
-        scenario=session.scenario,
-        state=session.state.model_dump(),
-    )
+    return {
+        "session_id": session.session_id,
+        "scenario": session.scenario,
+        "state": session.state_dump(),
+    }
 
 
 @app.delete("/sessions/{session_id}", tags=["session"])
-def end_session(session_id: str = ApiPath(...)):
+async def end_session(session_id: str = ApiPath(...)):
     """Destroy a session and free its memory."""
     sessions.delete(session_id)
     return {"deleted": session_id}
@@ -282,45 +424,36 @@ def end_session(session_id: str = ApiPath(...)):
 # ------------------------------------------------------------------
 
 @app.post("/sessions/{session_id}/start", tags=["simulation"])
-def start_session(
-    session_id: str = ApiPath(...),
+async def start_session(
     body: CreateSessionRequest = Body(default=CreateSessionRequest()),
+    session: Session = Depends(get_session),
 ):
     """
     (Re-)initialise the session with a chosen scenario.
     Useful when the visitor wants to try a different demo mode.
     """
-    try:
-        session = sessions.require(session_id)
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Session {session_id!r} not found")
+    if body.scenario not in SCENARIO_FACTORIES:
+        raise HTTPException(status_code=400, detail=f"Unknown scenario: {body.scenario!r}")
+    factory = resolve_scenario(body.scenario)
 
-    try:
-        from scenarios.vancouver_harbor import (
-            create_initial_state,
-            create_fog_scenario,
-            create_docking_scenario,
-            create_emergency_scenario,
-        )
-        factory = SCENARIO_FACTORIES.get(body.scenario)
-        if factory is None:
-            raise HTTPException(status_code=400, detail=f"Unknown scenario: {body.scenario!r}")
-        session.state = factory()
-        session.scenario = body.scenario
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    async with session.lock:
+        try:
+            session.state = factory()
+            session.scenario = body.scenario
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-    return {"session_id": session_id, "scenario": session.scenario, "state": session.state.model_dump()}
+    return {"session_id": session.session_id, "scenario": session.scenario, "state": session.state_dump()}
 
 
 @app.post(
     "/sessions/{session_id}/step",
-    response_model=StepResponse,
+    responses={200: {"model": StepResponse}},
     tags=["simulation"],
 )
-def step(
-    session_id: str = ApiPath(...),
+async def step(
     body: StepRequest = Body(default=StepRequest()),
+    session: Session = Depends(get_session),
 ):
     """
     Advance the simulation by one tick.
@@ -330,58 +463,63 @@ def step(
       - updated state     (for Unity to render)
       - explanations      (for the educational display panel)
     """
-    try:
-        session = sessions.require(session_id)
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Session {session_id!r} not found")
-
-    user_input = UserInput(
-        target_speed=body.target_speed,
-        target_heading=body.target_heading,
-        emergency_stop=body.emergency_stop or False,
-    )
-
-    try:
-        state_before = session.state.model_copy(deep=True)
-    except AttributeError:
-        state_before = session.state.copy(deep=True)
-
-    try:
-        session.state, explanations = session.engine.step(session.state, user_input)
-    except Exception as exc:
-        logger.exception("Error during step in session %s", session_id)
-        raise HTTPException(status_code=500, detail=str(exc))
-
-    explanation_out = [_explanation_to_out(e) for e in explanations]
+    user_input = UserInput(body.target_speed, body.target_heading, bool(body.emergency_stop))
+
+    # Concurrent steps on one session are applied in turn; the tick itself
+    # runs in a worker thread so other sessions keep being served
+    async with session.lock:
+        # The session caches only the history-less part of a state dump; the
+        # memo lets state_after reuse the history dumped here, so only the
+        # snapshot this tick appends gets dumped again
+        memo: SnapshotMemo = {}
+        state_before = session.state_dump(memo)
+
+        try:
+            session.state, explanations = await asyncio.to_thread(
+                session.engine.step, session.state, user_input
+            )
+        except Exception as exc:
+            logger.exception("Error during step in session %s", session.session_id)
+            raise HTTPException(status_code=500, detail=str(exc))
+
+        state_after = session.state_dump(memo)
+
+    # Encoded once, in orjson's native pass; shared by the response and the log
+    explanations_json = orjson.dumps(explanations, default=_orjson_default)
     rules_triggered = [e.rule_id for e in explanations if e.triggered]
 
-    _write_decision_log(
-        session_id=session_id,
+    # File append is blocking I/O; keep it off the event loop
+    await asyncio.to_thread(
+        _write_decision_log,
+        session_id=session.session_id,
         scenario=session.scenario,
         user_input=user_input,
         state_before=state_before,
-        state_after=session.state,
-        explanations=explanation_out,
+        state_after=state_after,
+        explanations_json=explanations_json,
         rules_triggered=rules_triggered,
     )
 
-    return StepResponse(
-        time_step=session.state.time_step,
-        state=session.state.model_dump(),
-        explanations=explanation_out,
-        rules_triggered=rules_triggered,
+    body = b'{"time_step":%d,"state":%s,"explanations":%s,"rules_triggered":%s}' % (
+        state_after["time_step"],
+        orjson.dumps(state_after),
+        explanations_json,
+        orjson.dumps(rules_triggered),
     )
+    return Response(content=body, media_type="application/json")
 
 
 @app.post("/sessions/{session_id}/reset", tags=["simulation"])
-def reset_session(session_id: str = ApiPath(...)):
+async def reset_session(session: Session = Depends(get_session)):
     """Reset the session back to its initial state (same scenario)."""
-    try:
-        session = sessions.reset(session_id)
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Session {session_id!r} not found")
+    async with session.lock:
+        try:
+            session = sessions.reset(session.session_id)
+        except KeyError:
+            # Deleted or expired while this request waited for the lock
+            raise HTTPException(status_code=404, detail=f"Session {session.session_id!r} not found")
 
-    return {"session_id": session_id, "time_step": session.state.time_step, "state": session.state.model_dump()}
+    return {"session_id": session.session_id, "time_step": session.state.time_step, "state": session.state_dump()}
 
 
 # ------------------------------------------------------------------
@@ -389,50 +527,66 @@ def reset_session(session_id: str = ApiPath(...)):
 # ------------------------------------------------------------------
 
 @app.get("/sessions/{session_id}/state", tags=["inspection"])
-def get_state(session_id: str = ApiPath(...)):
+async def get_state(session: Session = Depends(get_session)):
     """Return the current SystemState as JSON."""
-    try:
-        session = sessions.require(session_id)
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Session {session_id!r} not found")
-
-    return session.state.model_dump()
+    # Wait out an in-flight /step: it appends to the history being dumped
+    async with session.lock:
+        return ORJSONResponse(session.state_dump())
 
 
 @app.get(
     "/sessions/{session_id}/history",
-    response_model=HistoryResponse,
+    responses={200: {"model": HistoryResponse}},
     tags=["inspection"],
 )
-def get_history(session_id: str = ApiPath(...)):
+async def get_history(
+    session: Session = Depends(get_session),
+    since: Optional[int] = Query(
+        default=None,
+        description="Only return snapshots taken after this time step",
+    ),
+):
     """
-    Return all past StateSnapshots for this session.
-    Unity can use this for the educational rewind feature.
+    Return past StateSnapshots for this session (the most recent
+    HISTORY_LIMIT are kept). Unity can use this for the educational rewind
+    feature, passing ?since=<last time_step seen> to fetch only new ones.
     """
-    try:
-        session = sessions.require(session_id)
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Session {session_id!r} not found")
-
-    return HistoryResponse(
-        session_id=session_id,
-        total_steps=session.state.time_step,
-        snapshots=[s.model_dump() for s in session.state.history],
+    # Wait out an in-flight /step: it appends to the history being dumped
+    async with session.lock:
+        head = b'{"session_id":%s,"total_steps":%d,"snapshots":[' % (
+            orjson.dumps(session.session_id),
+            session.state.time_step,
+        )
+        # Frozen snapshot objects only; they are dumped while streaming
+        snapshots = session.history_since(since)
+    return StreamingResponse(
+        _stream_history(head, snapshots),
+        media_type="application/json",
     )
 
 
 @app.get("/sessions/{session_id}/rules", tags=["inspection"])
-def get_rules(session_id: str = ApiPath(...)):
+async def get_rules(session: Session = Depends(get_session)):
     """
     Return a summary of all loaded rules.
     Useful for Unity to build a dynamic rules-list panel.
     """
-    try:
-        session = sessions.require(session_id)
-    except KeyError:
-        raise HTTPException(status_code=404, detail=f"Session {session_id!r} not found")
-
     return {
-        "session_id": session_id,
+        "session_id": session.session_id,
         "rules": session.engine.get_rules_summary(),
     }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "api:app",
+        host=os.getenv("API_HOST", "0.0.0.0"),
+        port=int(os.getenv("API_PORT", "8000")),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("API_WORKERS", "1")),
+        limit_concurrency=1000,
+        timeout_keep_alive=30,
+    )
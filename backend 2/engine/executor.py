@@ -92,6 +92,7 @@ def apply_action(state: SystemState, action: Action, source_rule_id: str) -> Tup
                 metadata=action.metadata,
             )
             # mark active
+            state.mark_dirty("active_events")
             state.active_events[ev.event_type] = True
             side_effects["events"].append(ev)
             msg = f"SPAWN_EVENT {ev.event_type} (id={ev.id})"
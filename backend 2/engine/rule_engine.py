@@ -130,6 +130,7 @@ class RuleEngine:
         state.time_step += 1
 
         # Optional global metrics counters (if you want):
+        state.mark_dirty("global_metrics")
         if "rules_triggered_count" in state.global_metrics:
             state.global_metrics["rules_triggered_count"] += 1.0
         if "decision_count" in state.global_metrics:
@@ -42,6 +42,9 @@ def set_value(state: SystemState, path: str, value: Any) -> None:
     if len(parts) == 1:
         setattr(state, parts[0], value)
         return
+    if len(parts) == 2:
+        # Writing into a top-level container that may be shared with a snapshot
+        state.mark_dirty(parts[0])
 
     current: Any = state
     for part in parts[:-1]:
@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, Any, Dict
 from .enums import ActionType
 
 
 class Action(BaseModel):
     """Enhanced action supporting complex operations and rule chaining"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     type: ActionType
     target: Optional[str] = None  # e.g. "agents.tugboat.speed" or "global_metrics.collision_risk"
     value: Optional[Any] = None  # Can be float, str, bool, etc.
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Literal, List, Dict, Any, Optional
 from .enums import ConflictStrategy
 from .action import Action
@@ -6,6 +6,8 @@ from .action import Action
 
 class ConflictResolution(BaseModel):
     """Conflict resolution configuration for handling rule conflicts"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     strategy: ConflictStrategy = ConflictStrategy.PRIORITY
     priority_threshold: Optional[int] = None  # Minimum priority difference to auto-resolve
     merge_rules: Optional[List[str]] = None  # Rules that can be merged
@@ -14,6 +16,8 @@ class ConflictResolution(BaseModel):
 
 class ConflictRecord(BaseModel):
     """Record of a conflict that occurred during rule execution"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     timestamp: int
     conflicting_rules: List[str]  # Rule IDs involved in conflict
     conflicting_actions: List[Action]  # Actions that conflicted
@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 
 class Event(BaseModel):
     """Event model for rule chaining and event-driven simulation"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     id: str
     source_rule: str  # ID of rule that generated this event
     timestamp: int  # Time step when event occurred
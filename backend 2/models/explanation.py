@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, List, Optional, Any
 from .rule import Condition
 from .action import Action
@@ -6,6 +6,8 @@ from .action import Action
 
 class ConditionEvaluation(BaseModel):
     """Record of how a condition was evaluated"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     condition: Condition
     left_value: Any  # Actual value of left side
     right_value: Any  # Actual value of right side
@@ -15,6 +17,8 @@ class ConditionEvaluation(BaseModel):
 
 class ActionApplication(BaseModel):
     """Record of an action that was applied"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     action: Action
     target_old_value: Any  # Value before action
     target_new_value: Any  # Value after action
@@ -24,6 +28,8 @@ class ActionApplication(BaseModel):
 
 class Explanation(BaseModel):
     """Enhanced explanation with full causal chain for educational transparency"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     rule_id: str
     priority: int
     triggered: bool
@@ -51,6 +57,9 @@ class Explanation(BaseModel):
     # Causal chain (for rule chaining visualization)
     triggered_by: Optional[str] = None  # Rule ID that triggered this rule
     triggered_rules: List[str] = []  # Rule IDs triggered by this rule
+
+    # Copied from Rule.template_clean: message is already single-line
+    template_clean: bool = Field(default=False, exclude=True)
     
     def to_educational_format(self) -> Dict[str, Any]:
         """Format explanation for educational display"""
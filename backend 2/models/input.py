@@ -1,8 +1,13 @@
-from pydantic import BaseModel
+from dataclasses import dataclass
 from typing import Optional
 
 
-class UserInput(BaseModel):
+@dataclass(frozen=True, slots=True)
+class UserInput:
+    """
+    Visitor controls for one tick. Built per /step from the already-validated
+    StepRequest, so a plain frozen dataclass is enough here.
+    """
     target_speed: Optional[float] = None
     target_heading: Optional[float] = None
-    emergency_stop: Optional[bool] = False
+    emergency_stop: bool = False
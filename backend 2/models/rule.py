@@ -1,11 +1,13 @@
-from pydantic import BaseModel
-from typing import List, Union, Literal
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+from typing import Any, List, Tuple, Union, Literal
 from .action import Action
-from .enums import Operator, ConditionLogic
+from .enums import ActionType, Operator, ConditionLogic
 
 
 class Condition(BaseModel):
     """Enhanced condition supporting nested paths and agent-to-agent comparisons"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     left: str  # e.g. "agents.tugboat.speed" or "environment.wind_speed"
     operator: Operator
     right: Union[str, float, int, bool]  # Can be value or another field path for comparison
@@ -15,6 +17,8 @@ class Condition(BaseModel):
 
 class Rule(BaseModel):
     """Enhanced rule supporting complex logic and rule chaining"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     id: str
     priority: int
     conditions: List[Condition]  # Renamed from 'condition' for clarity
@@ -22,7 +26,30 @@ class Rule(BaseModel):
     action: List[Action]
     explanation_template: str
     metadata: dict = {}  # Additional rule metadata (tags, category, etc.)
-    
+
+    # Set once at construction: the template has no newlines, tabs or runs of
+    # spaces, so messages rendered from it need no whitespace clean-up
+    _template_clean: bool = PrivateAttr(default=False)
+    # Targets written by SET/ADD/CLAMP actions, in declaration order
+    _mutating_targets: Tuple[str, ...] = PrivateAttr(default=())
+
+    def model_post_init(self, __context: Any) -> None:
+        template = self.explanation_template
+        self._template_clean = template == " ".join(template.split())
+        self._mutating_targets = tuple(
+            a.target
+            for a in self.action
+            if a.type in (ActionType.SET, ActionType.ADD, ActionType.CLAMP)
+        )
+
+    @property
+    def template_clean(self) -> bool:
+        return self._template_clean
+
+    @property
+    def mutating_targets(self) -> Tuple[str, ...]:
+        return self._mutating_targets
+
     def evaluate_conditions(self, state: "SystemState") -> bool:
         """
         Evaluate all conditions based on logic (AND/OR).
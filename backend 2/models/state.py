@@ -1,12 +1,20 @@
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+import sys
+from collections import deque
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
+from typing import Deque, FrozenSet, List, Dict, Optional
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .rule import Rule
 
 
+# Maximum number of snapshots kept in SystemState.history (oldest dropped first)
+HISTORY_LIMIT = 500
+
+
 class AgentState(BaseModel):
+    model_config = ConfigDict(extra="ignore")  # mutable: not frozen
+
     id: str
     type: str  # tugboat / cargo_ship
     position_x: float
@@ -15,8 +23,18 @@ class AgentState(BaseModel):
     heading: float  # angle in degrees
     metadata: Optional[Dict] = None
 
+    # Ids and types come from a handful of names: share one string object per
+    # name, so comparisons against the (also interned) rule values hit the
+    # identity check
+    @field_validator("id", "type", mode="after")
+    @classmethod
+    def _intern(cls, value: str) -> str:
+        return sys.intern(value)
+
 
 class EnvironmentState(BaseModel):
+    model_config = ConfigDict(extra="ignore")  # mutable: not frozen
+
     wind_speed: float
     wind_direction: float
     visibility: float  # in km
@@ -24,9 +42,16 @@ class EnvironmentState(BaseModel):
     berth_heading: Optional[float] = None  # target heading for berth alignment (degrees)
     metadata: Optional[Dict] = None
 
+    @field_validator("zone", mode="after")
+    @classmethod
+    def _intern(cls, value: str) -> str:
+        return sys.intern(value)
+
 
 class StateSnapshot(BaseModel):
     """Immutable snapshot of system state at a specific time step (for history/replay)"""
+    model_config = ConfigDict(frozen=True, extra="ignore")
+
     timestamp: int
     agents: Dict[str, AgentState]
     environment: EnvironmentState
@@ -44,22 +69,51 @@ class SystemState(BaseModel):
     global_metrics  — numeric metrics shared across agents
     active_events   — events that are currently active (persist until cleared)
     time_step       — current simulation tick
-    history         — list of past snapshots for replay / explanation rewind
+    history         — the last HISTORY_LIMIT snapshots for replay / explanation rewind
     """
+    model_config = ConfigDict(extra="ignore")  # mutable: not frozen
+
     agents: Dict[str, AgentState]
     environment: EnvironmentState
     global_metrics: Dict[str, float]
     active_events: Dict[str, bool] = {}  # keyed by event_type
     time_step: int = 0
-    history: List[StateSnapshot] = []
+    history: Deque[StateSnapshot] = Field(
+        default_factory=lambda: deque(maxlen=HISTORY_LIMIT)
+    )
+
+    # Dict fields whose object is currently shared with the latest snapshot
+    _shared: FrozenSet[str] = PrivateAttr(default=frozenset())
+
+    @field_validator("history", mode="after")
+    @classmethod
+    def _bound_history(cls, history: Deque[StateSnapshot]) -> Deque[StateSnapshot]:
+        """Keep history as a ring buffer so long sessions use bounded memory."""
+        if history.maxlen == HISTORY_LIMIT:
+            return history
+        return deque(history, maxlen=HISTORY_LIMIT)
 
     def create_snapshot(self, rules_triggered: Optional[List[str]] = None) -> StateSnapshot:
-        """Capture current state into an immutable snapshot"""
-        return StateSnapshot(
+        """
+        Capture current state into an immutable snapshot.
+
+        The dicts are shared with the snapshot rather than copied (copy-on-write):
+        anything mutating one of them in place must call mark_dirty() first.
+        """
+        # Fields are already validated on this state; construct skips the re-copy
+        snapshot = StateSnapshot.model_construct(
             timestamp=self.time_step,
-            agents=dict(self.agents),
+            agents=self.agents,
             environment=self.environment,
-            global_metrics=dict(self.global_metrics),
-            active_events=dict(self.active_events),
+            global_metrics=self.global_metrics,
+            active_events=self.active_events,
             rules_triggered=rules_triggered or [],
         )
+        self._shared = frozenset(("agents", "global_metrics", "active_events"))
+        return snapshot
+
+    def mark_dirty(self, field: str) -> None:
+        """Give *field* a private dict before it is mutated in place."""
+        if field in self._shared:
+            setattr(self, field, dict(getattr(self, field)))
+            self._shared = self._shared - {field}
@@ -18,13 +18,18 @@ Responsibilities
 7. Save StateSnapshot to history for replay / rewind
 """
 
+import ast
+import operator
 import re
+import sys
 import logging
 import yaml
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
-from models.state import AgentState, EnvironmentState, StateSnapshot, SystemState
+from models.state import HISTORY_LIMIT, AgentState, EnvironmentState, StateSnapshot, SystemState
 from models.rule import Condition, Rule
 from models.action import Action
 from models.event import Event
@@ -35,72 +40,435 @@ from models.input import UserInput
 
 logger = logging.getLogger("RuleEngine")
 
+# libyaml-backed loader when PyYAML was built with it (much faster to parse)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Compiled once; used on every action value / template / expression evaluation
+_TEMPLATE_FULL = re.compile(r"\{\{(.+)\}\}")      # whole value is "{{ expr }}"
+_TEMPLATE_ANY = re.compile(r"\{\{(.+?)\}\}")      # each "{{ expr }}" in a template
+_PATH_RE = re.compile(
+    r"\b("
+    r"agents\.[a-zA-Z_]\w*\.[a-zA-Z_]\w*"
+    r"|environment\.[a-zA-Z_]\w*"
+    r"|global_metrics\.[a-zA-Z_]\w*"
+    r"|events\.[a-zA-Z_]\w*"
+    r")\b"
+)
+
+# AST nodes allowed in a template expression: numeric arithmetic only
+_EXPR_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow,
+    ast.UAdd, ast.USub,
+)
+
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _copy(model, **updates):
-    """Pydantic v1 / v2 compatible model copy."""
+def _intern(value: Any) -> Any:
+    """sys.intern() strings from the rules file; other values pass through."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class _WorkingState:
+    """
+    Mutable stand-in for SystemState for the duration of one tick.
+
+    Exposes the attributes the compiled accessors read (agents, environment,
+    global_metrics, active_events, time_step). Each part is copied the first
+    time it is written this tick and edited in place after that, and build()
+    makes the one new SystemState at the end — instead of a model copy of the
+    whole state per action.
+    """
+
+    __slots__ = (
+        "base", "agents", "environment", "global_metrics", "active_events",
+        "time_step", "_owned_agents", "_owned",
+    )
+
+    def __init__(self, base: SystemState):
+        self.base = base
+        self.agents = base.agents
+        self.environment = base.environment
+        self.global_metrics = base.global_metrics
+        self.active_events = base.active_events
+        self.time_step = base.time_step
+        self._owned_agents: Set[str] = set()  # agent ids already copied
+        self._owned: Set[str] = set()         # other parts already copied
+
+    def set_agent_field(self, agent_id: str, field: str, value: Any) -> None:
+        if agent_id not in self.agents:
+            raise KeyError(f"Agent not found: {agent_id!r}")
+        if agent_id not in self._owned_agents:
+            if "agents" not in self._owned:
+                self.agents = dict(self.agents)
+                self._owned.add("agents")
+            self.agents[agent_id] = self.agents[agent_id].model_copy()
+            self._owned_agents.add(agent_id)
+        setattr(self.agents[agent_id], field, value)
+
+    def set_environment_field(self, field: str, value: Any) -> None:
+        if "environment" not in self._owned:
+            self.environment = self.environment.model_copy()
+            self._owned.add("environment")
+        setattr(self.environment, field, value)
+
+    def metrics_for_update(self) -> Dict[str, float]:
+        if "global_metrics" not in self._owned:
+            self.global_metrics = dict(self.global_metrics)
+            self._owned.add("global_metrics")
+        return self.global_metrics
+
+    def events_for_update(self) -> Dict[str, bool]:
+        if "active_events" not in self._owned:
+            self.active_events = dict(self.active_events)
+            self._owned.add("active_events")
+        return self.active_events
+
+    def build(self, **updates: Any) -> SystemState:
+        """The tick's resulting SystemState (the base state is left untouched)."""
+        return self.base.model_copy(update=dict(
+            agents=self.agents,
+            environment=self.environment,
+            global_metrics=self.global_metrics,
+            active_events=self.active_events,
+            time_step=self.time_step,
+            **updates,
+        ))
+
+
+# Compiled accessors: rule paths are fixed at load time, so each one is
+# specialised once into a closure instead of being split/dispatched per call
+Getter = Callable[[SystemState], Any]
+Setter = Callable[[_WorkingState, Any], None]
+Comparator = Callable[[Any, Any], bool]
+# A whole condition: state -> (left_value, right_value, result, error)
+Check = Callable[[SystemState], Tuple[Any, Any, bool, Optional[Exception]]]
+
+_PATH_PREFIXES = ("agents", "environment", "global_metrics", "events")
+
+
+@lru_cache(maxsize=1024)
+def _compile_getter(path: Any) -> Getter:
+    """
+    Compile a dot-notation path into a reader.
+
+    Supported prefixes
+    ------------------
+    agents.{id}.{field}         → AgentState field
+    environment.{field}         → EnvironmentState field
+    global_metrics.{name}       → float metric
+    events.{event_type}         → bool (True if event is active)
+    """
+    if not isinstance(path, str):
+        return lambda state: path
+
+    parts = path.split(".")
+    prefix = parts[0]
+
+    if prefix == "agents":
+        if len(parts) < 3:
+            error = f"Invalid agent path: {path!r}"
+        else:
+            agent_id, field = parts[1], parts[2]
+
+            def get_agent_field(state: SystemState) -> Any:
+                agents = state.agents
+                if agent_id not in agents:
+                    raise KeyError(f"Agent not found: {agent_id!r}")
+                return getattr(agents[agent_id], field)
+
+            return get_agent_field
+
+    elif prefix in ("environment", "global_metrics", "events"):
+        if len(parts) < 2:
+            error = f"Invalid {prefix} path: {path!r}"
+        else:
+            name = parts[1]
+            if prefix == "environment":
+                return lambda state: getattr(state.environment, name)
+            if prefix == "global_metrics":
+                return lambda state: state.global_metrics.get(name, 0.0)
+            return lambda state: state.active_events.get(name, False)
+
+    else:
+        error = f"Unknown path prefix in: {path!r}"
+
+    def invalid(state: SystemState) -> Any:
+        raise ValueError(error)
+
+    return invalid
+
+
+@lru_cache(maxsize=1024)
+def _compile_setter(path: Any) -> Setter:
+    """Compile a dot-notation path into a writer on a _WorkingState."""
+    parts = path.split(".") if isinstance(path, str) else []
+    prefix = parts[0] if parts else None
+
+    if prefix == "agents" and len(parts) >= 3:
+        agent_id, field = parts[1], parts[2]
+
+        def set_agent_field(state: _WorkingState, value: Any) -> None:
+            state.set_agent_field(agent_id, field, value)
+
+        return set_agent_field
+
+    if prefix == "environment" and len(parts) >= 2:
+        field = parts[1]
+
+        def set_environment_field(state: _WorkingState, value: Any) -> None:
+            state.set_environment_field(field, value)
+
+        return set_environment_field
+
+    if prefix == "global_metrics" and len(parts) >= 2:
+        metric = parts[1]
+
+        def set_metric(state: _WorkingState, value: Any) -> None:
+            state.metrics_for_update()[metric] = float(value)
+
+        return set_metric
+
+    def invalid(state: _WorkingState, value: Any) -> None:
+        raise ValueError(f"Cannot set path: {path!r}")
+
+    return invalid
+
+
+def _compile_operand(value: Any) -> Getter:
+    """
+    Compile a condition operand / action value: a "{{ expr }}" template
+    ("{{agents.cargo_ship.speed + 2.0}}"), a field path ("agents.tugboat.speed"),
+    or a literal (float, int, str, bool) returned as-is.
+    """
+    # Strings without "{" or "." can be neither a template nor a path
+    if isinstance(value, str) and ("{" in value or "." in value):
+        m = _TEMPLATE_FULL.fullmatch(value.strip())
+        if m:
+            expr = m.group(1).strip()
+            return lambda state: _evaluate_expression(state, expr)
+
+        prefix = value.split(".")[0] if "." in value else ""
+        if prefix in _PATH_PREFIXES:
+            get = _compile_getter(value)
+
+            def get_path_or_literal(state: SystemState) -> Any:
+                try:
+                    return get(state)
+                except (KeyError, ValueError, AttributeError):
+                    return value  # treat as literal string
+
+            return get_path_or_literal
+
+    return lambda state: value
+
+
+_ORDERING_OPS = {
+    Operator.LT: operator.lt,
+    Operator.GT: operator.gt,
+    Operator.LE: operator.le,
+    Operator.GE: operator.ge,
+}
+_NUMBER_TYPES = (int, float)
+
+# Actions that only record something; they never change state
+_PASSIVE_ACTIONS = frozenset((ActionType.RECOMMEND, ActionType.TRIGGER_RULE, ActionType.LOG))
+
+
+def _equals(left: Any, right: Any) -> bool:
+    # Equal strings (zones, ids: interned, so usually the same object) need
+    # no float() attempt
+    if type(left) is str and type(right) is str and left == right:
+        return True
+    # Bool-aware equality (events return bool)
+    if isinstance(left, bool) or isinstance(right, bool):
+        return bool(left) == bool(right)
     try:
-        return model.model_copy(update=updates)  # pydantic v2
-    except AttributeError:
-        return model.copy(update=updates)          # pydantic v1
+        return float(left) == float(right)
+    except (TypeError, ValueError):
+        return str(left) == str(right)
+
+
+def _contains(left: Any, right: Any) -> bool:
+    return left in right
+
+
+@lru_cache(maxsize=None)
+def _compile_comparison(op: Operator) -> Comparator:
+    """Compile an operator into a numeric / equality comparison function."""
+    if op == Operator.EQ:
+        return _equals
+    if op == Operator.IN:
+        return _contains
+
+    fn = _ORDERING_OPS.get(op)
+    if fn is None:
+        return lambda left, right: False
+
+    def compare(left: Any, right: Any) -> bool:
+        # Fast path: both sides already plain numbers (bools go through float())
+        if type(left) in _NUMBER_TYPES and type(right) in _NUMBER_TYPES:
+            return fn(left, right)
+        try:
+            lf, rf = float(left), float(right)
+        except (TypeError, ValueError):
+            return False
+        return fn(lf, rf)
+
+    return compare
+
+
+def _compile_check(left: Getter, right: Getter, compare: Comparator) -> Check:
+    """Fuse a condition's compiled readers and comparison into one callable."""
+    def check(state: SystemState) -> Tuple[Any, Any, bool, Optional[Exception]]:
+        try:
+            left_val = left(state)
+            right_val = right(state)
+            return left_val, right_val, compare(left_val, right_val), None
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Condition eval error: %s", exc)
+            return None, None, False, exc
+
+    return check
+
+
+@lru_cache(maxsize=512)
+def _compile_expr(expr: str) -> Tuple[Callable[..., Any], Tuple[Getter, ...]]:
+    """
+    Compile a template expression such as "agents.cargo_ship.speed + 2.0" once.
+
+    Each distinct field path becomes a parameter (_p0, _p1 …) of a generated
+    function, e.g. ``lambda _p0: _p0 + 2.0``. Returns (function, getters) with
+    one getter per parameter, in order; raises ValueError / SyntaxError when
+    the expression is anything other than numeric arithmetic.
+    """
+    names: Dict[str, str] = {}
+
+    def _placeholder(match: re.Match) -> str:  # type: ignore[type-arg]
+        path = match.group(0)
+        if path not in names:
+            names[path] = f"_p{len(names)}"
+        return names[path]
+
+    source = _PATH_RE.sub(_placeholder, expr).strip()
+    tree = ast.parse(source, mode="eval")
+    allowed_names = set(names.values())
+    for node in ast.walk(tree):
+        if not isinstance(node, _EXPR_NODES):
+            raise ValueError(f"unsupported syntax: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in allowed_names:
+            raise ValueError(f"unknown name: {node.id}")
+        if isinstance(node, ast.Constant) and (
+            isinstance(node.value, bool) or not isinstance(node.value, (int, float))
+        ):
+            raise ValueError(f"non-numeric literal: {node.value!r}")
+
+    # Validated above: the source is arithmetic over the parameters only
+    params = ", ".join(names.values())
+    code = compile(f"lambda {params}: ({source})", "<template>", "eval")
+    fn = eval(code, {"__builtins__": {}})  # noqa: S307
+    return fn, tuple(_compile_getter(path) for path in names)
+
+
+def _evaluate_expression(state: SystemState, expr: str) -> float:
+    """
+    Safely evaluate a template arithmetic expression such as
+    "agents.cargo_ship.speed + 2.0" or "environment.wind_direction + 90"
+    against *state*. Only numeric arithmetic on field paths and constants is
+    allowed; anything else evaluates to 0.0.
+    """
+    try:
+        fn, getters = _compile_expr(expr)
+    except (SyntaxError, ValueError) as exc:
+        logger.warning("Template expression eval failed %r: %s", expr, exc)
+        return 0.0
+
+    # Resolve each field path's numeric value, in parameter order
+    args: List[float] = []
+    for get in getters:
+        try:
+            args.append(float(get(state)))
+        except Exception:  # noqa: BLE001
+            args.append(0.0)
+
+    try:
+        return float(fn(*args))
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Template expression eval failed %r: %s", expr, exc)
+        return 0.0
 
 
 # ---------------------------------------------------------------------------
-# RuleEngine
+# RuleBase
 # ---------------------------------------------------------------------------
 
-class RuleEngine:
+class RuleBase:
     """
-    Priority-ordered, event-aware rule engine that drives the simulation and
-    produces educational explanations of every decision made.
+    The rules of one rules file, parsed and compiled once.
+
+    Read-only after construction: it holds no simulation state, so any number
+    of RuleEngine instances (one per session) can share it.
 
     Usage
     -----
-    engine = RuleEngine("rules/harbor_rules.yaml")
-    state, explanations = engine.step(state, user_input)
+    rulebase = RuleBase("rules/harbor_rules.yaml")
+    engine = RuleEngine.from_shared(rulebase)
     """
 
-    def __init__(
-        self,
-        rules_path: str,
-        conflict_strategy: ConflictStrategy = ConflictStrategy.PRIORITY,
-    ):
-        self.rules_path = rules_path
-        self.conflict_strategy = conflict_strategy
-        self.rules: List[Rule] = []
-        self.rules_by_id: Dict[str, Rule] = {}
-        self._load_rules()
-
-    # =========================================================================
-    # 1. Rule Loading
-    # =========================================================================
-
-    def _load_rules(self) -> None:
-        """Parse harbor_rules.yaml and populate self.rules / self.rules_by_id."""
-        path = Path(self.rules_path)
-        if not path.exists():
-            raise FileNotFoundError(f"Rules file not found: {self.rules_path}")
+    # Parsed YAML per resolved rules path, reused while the file's
+    # (mtime, size) is unchanged
+    _parse_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
 
-        with open(path, "r") as f:
-            data = yaml.safe_load(f)
+    _by_priority = operator.attrgetter("priority")
 
+    def __init__(self, rules_path: str, data: Optional[Dict[str, Any]] = None):
+        """
+        *data* is the already-parsed rules document (see rules_cache); when
+        omitted, the file at *rules_path* is parsed.
+        """
+        self.rules_path = rules_path
+        self.rules: Tuple[Rule, ...] = ()
+        self.rules_by_id: Dict[str, Rule] = {}
+        # Per rule id: a compiled check for each condition and
+        # (read target, write target, read value) for each action
+        self.conditions: Dict[str, Tuple[Check, ...]] = {}
+        self.accessors: Dict[str, Tuple[Tuple[Getter, Setter, Getter], ...]] = {}
+        # Per rule id: (side_effects, events_generated, triggered_rules) — fixed
+        # by the rule's actions, so listed once in declaration order
+        self.effects: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = {}
+        # Rules that can fire in each zone, in priority order. A rule gated on
+        # a zone (AND with environment.zone == "<zone>") appears only under
+        # that zone; ungated_rules are the ones for any other zone.
+        self.rules_by_zone: Dict[str, Tuple[Rule, ...]] = {}
+        self.ungated_rules: Tuple[Rule, ...] = ()
+        if data is None:
+            path = Path(rules_path)
+            if not path.exists():
+                raise FileNotFoundError(f"Rules file not found: {rules_path}")
+            data = self._parse_rules_file(path)
+        self._load_rules(data)
+
+    def _load_rules(self, data: Dict[str, Any]) -> None:
+        """Build and compile every rule of the parsed rules document *data*."""
         raw_rules = data.get("rules", [])
-        self.rules = []
+        rules: List[Rule] = []
 
         for raw in raw_rules:
             # ---- conditions ----
             conditions: List[Condition] = []
             raw_conditions = raw.get("conditions", raw.get("condition", []))
             for c in raw_conditions:
-                # Accept both new format (left/right) and old format (field/value)
-                left = c.get("left", c.get("field", ""))
-                right = c.get("right", c.get("value", 0))
-                operator = c.get("operator", "==")
+                # Accept both new format (left/right) and old format (field/value).
+                # Paths recur across rules and key the compile caches: intern them
+                left = sys.intern(str(c.get("left", c.get("field", ""))))
+                right = _intern(c.get("right", c.get("value", 0)))
+                # Normalised to the enum once here; evaluation never re-parses it
+                operator = Operator(c.get("operator", "=="))
                 conditions.append(
-                    Condition(left=str(left), operator=operator, right=right)
+                    Condition(left=left, operator=operator, right=right)
                 )
 
             # ---- actions ----
@@ -109,12 +477,12 @@ class RuleEngine:
                 actions.append(
                     Action(
                         type=ActionType(a["type"]),
-                        target=a.get("target", ""),
-                        value=a.get("value"),
+                        target=_intern(a.get("target", "")),
+                        value=_intern(a.get("value")),
                         min_value=a.get("min_value"),
                         max_value=a.get("max_value"),
-                        rule_id=a.get("rule_id"),
-                        event_type=a.get("event_type"),
+                        rule_id=_intern(a.get("rule_id")),
+                        event_type=_intern(a.get("event_type")),
                         event_payload=a.get("event_payload"),
                         log_level=a.get("log_level", "info"),
                         log_message=a.get("log_message"),
@@ -124,21 +492,178 @@ class RuleEngine:
 
             logic_raw = raw.get("logic", "AND")
             rule = Rule(
-                id=raw["id"],
+                id=_intern(raw["id"]),
                 priority=raw.get("priority", 0),
                 conditions=conditions,
                 logic=ConditionLogic(logic_raw),
                 action=actions,
-                explanation_template=raw.get("explanation_template", ""),
+                # Folded to single spaces once here (YAML block scalars keep
+                # their line breaks) so rendered messages need no clean-up
+                explanation_template=" ".join(raw.get("explanation_template", "").split()),
                 metadata=raw.get("metadata", {}),
             )
-            self.rules.append(rule)
+            rules.append(rule)
             self.rules_by_id[rule.id] = rule
 
-        # Sort highest priority first so conflicts resolve naturally
-        self.rules.sort(key=lambda r: r.priority, reverse=True)
+        # Sort highest priority first so conflicts resolve naturally; the
+        # order is fixed from here on, so keep it as a tuple
+        self.rules = tuple(sorted(rules, key=self._by_priority, reverse=True))
+
+        for rule in self.rules:
+            self.conditions[rule.id] = tuple(
+                _compile_check(
+                    _compile_operand(c.left),
+                    _compile_operand(c.right),
+                    _compile_comparison(c.operator),
+                )
+                for c in rule.conditions
+            )
+            self.accessors[rule.id] = tuple(
+                (_compile_getter(a.target), _compile_setter(a.target), _compile_operand(a.value))
+                for a in rule.action
+            )
+            self.effects[rule.id] = self._list_effects(rule)
+
+        gates = {rule.id: self._zone_gate(rule) for rule in self.rules}
+        self.ungated_rules = tuple(r for r in self.rules if gates[r.id] is None)
+        for zone in {g for g in gates.values() if g is not None}:
+            self.rules_by_zone[zone] = tuple(
+                r for r in self.rules if gates[r.id] in (None, zone)
+            )
         logger.info("Loaded %d rules from %s", len(self.rules), self.rules_path)
 
+    @classmethod
+    def _parse_rules_file(cls, path: Path) -> Any:
+        """Parse *path* as YAML, reusing the previous parse if the file is unchanged."""
+        stat = path.stat()
+        key = str(path.resolve())
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = cls._parse_cache.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with open(path, "rb") as f:
+            data = yaml.load(f, Loader=_YAML_LOADER)
+        cls._parse_cache[key] = (signature, data)
+        return data
+
+    @staticmethod
+    def _zone_gate(rule: Rule) -> Optional[str]:
+        """
+        The zone *rule* requires through an AND-ed ``environment.zone == "<zone>"``
+        condition, or None. Only plain names count: a right side that is a
+        path, a template or a number string could match other zones.
+        """
+        if rule.logic != ConditionLogic.AND:
+            return None
+        for c in rule.conditions:
+            right = c.right
+            if (
+                c.left == "environment.zone"
+                and c.operator == Operator.EQ
+                and isinstance(right, str)
+                and "." not in right
+                and "{" not in right
+            ):
+                try:
+                    float(right)
+                except ValueError:
+                    return right
+        return None
+
+    @staticmethod
+    def _list_effects(
+        rule: Rule,
+    ) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+        """
+        (side_effects, events_generated, triggered_rules) for *rule*'s Explanation.
+        They depend only on the action definitions, not on how the actions ran.
+        """
+        side_effects: List[str] = []
+        events_generated: List[str] = []
+        triggered_rules: List[str] = []
+
+        for action in rule.action:
+            if action.type == ActionType.TRIGGER_RULE and action.rule_id:
+                triggered_rules.append(action.rule_id)
+                side_effects.append(f"Triggered rule: {action.rule_id}")
+            elif action.type == ActionType.SPAWN_EVENT and action.event_type:
+                events_generated.append(action.event_type)
+                side_effects.append(f"Spawned event: {action.event_type}")
+            elif action.type == ActionType.LOG:
+                side_effects.append(
+                    f"[{action.log_level.upper()}] {action.log_message}"
+                )
+
+        return tuple(side_effects), tuple(events_generated), tuple(triggered_rules)
+
+
+# ---------------------------------------------------------------------------
+# RuleEngine
+# ---------------------------------------------------------------------------
+
+class RuleEngine:
+    """
+    Priority-ordered, event-aware rule engine that drives the simulation and
+    produces educational explanations of every decision made.
+
+    Stateless with respect to the simulation: step() takes the state and
+    returns the next one, and the engine keeps nothing from either (its only
+    caches are keyed on rule paths and expressions). One engine can therefore
+    serve any number of sessions, across any number of resets.
+
+    Usage
+    -----
+    engine = RuleEngine("rules/harbor_rules.yaml")
+    state, explanations = engine.step(state, user_input)
+    """
+
+    # =========================================================================
+    # 1. Construction
+    # =========================================================================
+
+    def __init__(
+        self,
+        rules_path: str,
+        conflict_strategy: ConflictStrategy = ConflictStrategy.PRIORITY,
+        verbose_explanations: bool = True,
+    ):
+        self._bind(RuleBase(rules_path), conflict_strategy, verbose_explanations)
+
+    @classmethod
+    def from_shared(
+        cls,
+        rulebase: RuleBase,
+        conflict_strategy: ConflictStrategy = ConflictStrategy.PRIORITY,
+        verbose_explanations: bool = True,
+    ) -> "RuleEngine":
+        """Build an engine on an already-loaded *rulebase* (nothing is re-parsed)."""
+        engine = cls.__new__(cls)
+        engine._bind(rulebase, conflict_strategy, verbose_explanations)
+        return engine
+
+    def _bind(
+        self,
+        rulebase: RuleBase,
+        conflict_strategy: ConflictStrategy,
+        verbose_explanations: bool,
+    ) -> None:
+        self.rulebase = rulebase
+        self.rules_path = rulebase.rules_path
+        self.conflict_strategy = conflict_strategy
+        # False leaves the per-condition / per-action record messages empty
+        # (error messages are still filled in) for headless runs
+        self.verbose_explanations = verbose_explanations
+        # Shared with every other engine on the same rulebase: never mutated
+        self.rules = rulebase.rules
+        self.rules_by_id = rulebase.rules_by_id
+        self._conditions = rulebase.conditions
+        self._accessors = rulebase.accessors
+        self._effects = rulebase.effects
+        self._rules_by_zone = rulebase.rules_by_zone
+        self._ungated_rules = rulebase.ungated_rules
+
     # =========================================================================
     # 2. Main Step Function
     # =========================================================================
@@ -151,20 +676,29 @@ class RuleEngine:
         """
         Execute one simulation tick.
 
+        *state* itself is not modified, except that its history deque is
+        passed on to the updated state and the new snapshot appended to it:
+        callers keep the returned state and drop the old one.
+
         Returns
         -------
         (updated_state, explanations)
             updated_state   — SystemState after this tick
             explanations    — one Explanation per triggered rule (educational output)
         """
+        # All of this tick's changes accumulate here; one SystemState at the end
+        work = _WorkingState(state)
+
         # Apply user input before rule evaluation
         if user_input:
-            state = self._apply_user_input(state, user_input)
+            self._apply_user_input(work, user_input)
 
-        # Evaluate every rule → collect (rule, condition_evals) for triggered ones
+        # Evaluate every rule that can fire in the current zone → collect
+        # (rule, condition_evals) for triggered ones
+        candidates = self._rules_by_zone.get(work.environment.zone, self._ungated_rules)
         triggered: List[Tuple[Rule, List[ConditionEvaluation]]] = []
-        for rule in self.rules:
-            fired, evals = self._evaluate_rule(state, rule)
+        for rule in candidates:
+            fired, evals = self._evaluate_rule(work, rule)
             if fired:
                 triggered.append((rule, evals))
 
@@ -177,45 +711,61 @@ class RuleEngine:
 
         # Execute triggered rules in priority order; collect explanations
         all_explanations: List[Explanation] = []
-        chained_rule_ids: Set[str] = set()
+        # Chained rule id → id of the first rule that triggered it (dedup + provenance)
+        chained_by: Dict[str, str] = {}
+        # Counters, kept as rules run rather than re-walking the explanations
+        n_chained = 0
+        n_actions = 0
 
         for rule, evals in triggered:
-            state, explanation = self._execute_rule(state, rule, evals, triggered_by=None)
+            explanation = self._execute_rule(work, rule, evals, triggered_by=None)
             all_explanations.append(explanation)
+            n_actions += len(explanation.actions_applied)
             for rid in explanation.triggered_rules:
-                chained_rule_ids.add(rid)
+                chained_by.setdefault(rid, rule.id)
 
         # Execute chained rules (one level deep; evaluated against updated state)
-        for rule_id in chained_rule_ids:
-            if rule_id not in self.rules_by_id:
+        for rule_id, parent_id in chained_by.items():
+            chained = self.rules_by_id.get(rule_id)
+            if chained is None:
                 logger.warning("TRIGGER_RULE target not found: %s", rule_id)
                 continue
-            chained = self.rules_by_id[rule_id]
-            fired, evals = self._evaluate_rule(state, chained)
+            fired, evals = self._evaluate_rule(work, chained)
             if fired:
-                state, explanation = self._execute_rule(
-                    state, chained, evals, triggered_by=rule_id
+                explanation = self._execute_rule(
+                    work, chained, evals, triggered_by=parent_id
                 )
                 all_explanations.append(explanation)
-
-        # Update running counters
-        n_triggered = len(triggered) + len(
-            [e for e in all_explanations if e.triggered_by is not None]
-        )
-        n_actions = sum(len(e.actions_applied) for e in all_explanations)
-        metrics = dict(state.global_metrics)
-        metrics["rules_triggered_count"] = metrics.get("rules_triggered_count", 0.0) + n_triggered
-        metrics["decision_count"] = metrics.get("decision_count", 0.0) + n_actions
-        state = _copy(state, global_metrics=metrics)
+                n_chained += 1
+                n_actions += len(explanation.actions_applied)
+
+        # Update running counters. On a quiet tick they are unchanged, and
+        # global_metrics stays shared with the previous state instead of copied
+        n_triggered = len(triggered) + n_chained
+        if (
+            n_triggered
+            or n_actions
+            or "rules_triggered_count" not in work.global_metrics
+            or "decision_count" not in work.global_metrics
+        ):
+            metrics = work.metrics_for_update()
+            metrics["rules_triggered_count"] = metrics.get("rules_triggered_count", 0.0) + n_triggered
+            metrics["decision_count"] = metrics.get("decision_count", 0.0) + n_actions
 
         # Advance time step
-        state = _copy(state, time_step=state.time_step + 1)
-
-        # Persist snapshot to history
-        snapshot = state.create_snapshot(
-            rules_triggered=[e.rule_id for e in all_explanations if e.triggered]
+        work.time_step += 1
+
+        # The history ring buffer is handed on to the new state and appended in
+        # place (O(1) per tick rather than a copy of up to HISTORY_LIMIT entries)
+        history = state.history
+        if history.maxlen != HISTORY_LIMIT:
+            history = deque(history, maxlen=HISTORY_LIMIT)
+        state = work.build(history=history)
+        history.append(
+            state.create_snapshot(
+                rules_triggered=[e.rule_id for e in all_explanations if e.triggered]
+            )
         )
-        state = _copy(state, history=list(state.history) + [snapshot])
 
         return state, all_explanations
 
@@ -227,44 +777,59 @@ class RuleEngine:
         self, state: SystemState, rule: Rule
     ) -> Tuple[bool, List[ConditionEvaluation]]:
         """
-        Evaluate all conditions of *rule* against *state*.
+        Evaluate the conditions of *rule* against *state*, stopping as soon as
+        the AND / OR outcome is decided.
 
-        Returns (triggered: bool, condition_evaluations: List[ConditionEvaluation])
+        Returns (triggered: bool, condition_evaluations: List[ConditionEvaluation]).
+        The evaluation records (and their messages) are only built when the
+        rule fires — they cover every condition — and are empty otherwise.
         """
-        evals: List[ConditionEvaluation] = []
-        for condition in rule.conditions:
-            result, ev = self._evaluate_condition(state, condition)
-            evals.append(ev)
-
-        results = [e.result for e in evals]
-        if rule.logic == ConditionLogic.AND:
-            triggered = all(results)
-        else:  # OR
-            triggered = any(results)
-
-        return triggered, evals
-
-    def _evaluate_condition(
-        self, state: SystemState, condition: Condition
-    ) -> Tuple[bool, ConditionEvaluation]:
-        """Evaluate a single condition. Returns (result, ConditionEvaluation)."""
-        try:
-            left_val = self._resolve_value(state, condition.left)
-            right_val = self._resolve_value(state, condition.right)
-            result = self._compare(left_val, condition.operator, right_val)
+        checks = self._conditions[rule.id]
+        # AND is decided by the first False, OR by the first True
+        decisive = rule.logic != ConditionLogic.AND
+        triggered = not decisive
+
+        outcomes: List[Tuple[Any, Any, bool, Optional[Exception]]] = []
+        for check in checks:
+            outcome = check(state)
+            outcomes.append(outcome)
+            if bool(outcome[2]) == decisive:
+                triggered = decisive
+                break
+
+        if not triggered:
+            return False, []
+
+        # Fired: finish any conditions an OR skipped, then build the records
+        for check in checks[len(outcomes):]:
+            outcomes.append(check(state))
+
+        return True, [
+            self._explain_condition(condition, *outcome)
+            for condition, outcome in zip(rule.conditions, outcomes)
+        ]
+
+    def _explain_condition(
+        self,
+        condition: Condition,
+        left_val: Any,
+        right_val: Any,
+        result: bool,
+        error: Optional[Exception],
+    ) -> ConditionEvaluation:
+        """Build the ConditionEvaluation record for a checked condition."""
+        if error is not None:
+            message = f"Evaluation error: {error}"
+        elif not self.verbose_explanations:
+            message = ""
+        else:
             message = (
                 f"{condition.left} [{left_val!r}] "
                 f"{condition.operator.value} "
                 f"{condition.right} [{right_val!r}] "
                 f"→ {'✓ true' if result else '✗ false'}"
             )
-        except Exception as exc:  # noqa: BLE001
-            result = False
-            left_val = right_val = None
-            message = f"Evaluation error: {exc}"
-            logger.warning("Condition eval error: %s", exc)
-
-        return result, ConditionEvaluation(
+        return ConditionEvaluation(
             condition=condition,
             left_value=left_val,
             right_value=right_val,
@@ -272,66 +837,23 @@ class RuleEngine:
             message=message,
         )
 
-    def _compare(self, left: Any, operator: Operator, right: Any) -> bool:
-        """Numeric and equality comparison between two resolved values."""
-        op = Operator(operator) if isinstance(operator, str) else operator
-
-        # Bool-aware equality (events return bool)
-        if op == Operator.EQ:
-            if isinstance(left, bool) or isinstance(right, bool):
-                return bool(left) == bool(right)
-            try:
-                return float(left) == float(right)
-            except (TypeError, ValueError):
-                return str(left) == str(right)
-
-        if op == Operator.IN:
-            return left in right
-
-        # Numeric comparisons
-        try:
-            lf, rf = float(left), float(right)
-        except (TypeError, ValueError):
-            return False
-
-        return {
-            Operator.LT: lf < rf,
-            Operator.GT: lf > rf,
-            Operator.LE: lf <= rf,
-            Operator.GE: lf >= rf,
-        }.get(op, False)
-
     # =========================================================================
     # 4. Action Execution
     # =========================================================================
 
     def _execute_rule(
         self,
-        state: SystemState,
+        state: _WorkingState,
         rule: Rule,
         condition_evals: List[ConditionEvaluation],
         triggered_by: Optional[str],
-    ) -> Tuple[SystemState, Explanation]:
-        """Execute all actions of *rule* and return updated state + Explanation."""
-        apps: List[ActionApplication] = []
-        side_effects: List[str] = []
-        events_generated: List[str] = []
-        triggered_rules: List[str] = []
-
-        for action in rule.action:
-            state, app = self._execute_action(state, action, rule.id)
-            apps.append(app)
-
-            if action.type == ActionType.TRIGGER_RULE and action.rule_id:
-                triggered_rules.append(action.rule_id)
-                side_effects.append(f"Triggered rule: {action.rule_id}")
-            elif action.type == ActionType.SPAWN_EVENT and action.event_type:
-                events_generated.append(action.event_type)
-                side_effects.append(f"Spawned event: {action.event_type}")
-            elif action.type == ActionType.LOG:
-                side_effects.append(
-                    f"[{action.log_level.upper()}] {action.log_message}"
-                )
+    ) -> Explanation:
+        """Execute all actions of *rule* against the working *state*; return its Explanation."""
+        apps: List[ActionApplication] = [
+            self._execute_action(state, action, rule.id, accessors)
+            for action, accessors in zip(rule.action, self._accessors[rule.id])
+        ]
+        side_effects, events_generated, triggered_rules = self._effects[rule.id]
 
         message = self._render_template(state, rule.explanation_template)
 
@@ -341,12 +863,13 @@ class RuleEngine:
             triggered=True,
             timestamp=state.time_step,
             conditions_evaluated=condition_evals,
-            logic_used=rule.logic.value if hasattr(rule.logic, "value") else str(rule.logic),
+            logic_used=rule.logic.value,
             actions_applied=apps,
             side_effects=side_effects,
             events_generated=events_generated,
             conflicts_encountered=[],
             message=message,
+            template_clean=rule.template_clean,
             cause={
                 "conditions_met": [
                     {"field": e.condition.left, "actual_value": e.left_value}
@@ -369,34 +892,49 @@ class RuleEngine:
             triggered_by=triggered_by,
             triggered_rules=triggered_rules,
         )
-        return state, explanation
+        return explanation
 
     def _execute_action(
-        self, state: SystemState, action: Action, rule_id: str
-    ) -> Tuple[SystemState, ActionApplication]:
-        """Execute a single action, mutate state, and return an application record."""
+        self,
+        state: _WorkingState,
+        action: Action,
+        rule_id: str,
+        accessors: Tuple[Getter, Setter, Getter],
+    ) -> ActionApplication:
+        """
+        Execute a single action, mutate the working state, and return an application record.
+        *accessors* are the action's compiled (read target, write target, read value).
+        """
+        atype = action.type
+        if atype in _PASSIVE_ACTIONS:
+            return self._record_passive_action(state, action, rule_id, accessors)
+
+        get_target, set_target, get_value = accessors
+        verbose = self.verbose_explanations
         old_val: Any = None
         new_val: Any = None
         success = True
         message = ""
 
         try:
-            if action.type == ActionType.SET:
-                old_val = self._resolve_path(state, action.target)
-                resolved = self._resolve_value(state, action.value)
-                state = self._set_path(state, action.target, resolved)
+            if atype == ActionType.SET:
+                old_val = get_target(state)
+                resolved = get_value(state)
+                set_target(state, resolved)
                 new_val = resolved
-                message = f"SET {action.target}: {old_val!r} → {new_val!r}"
+                if verbose:
+                    message = f"SET {action.target}: {old_val!r} → {new_val!r}"
 
-            elif action.type == ActionType.ADD:
-                old_val = self._resolve_path(state, action.target)
-                resolved = self._resolve_value(state, action.value)
+            elif atype == ActionType.ADD:
+                old_val = get_target(state)
+                resolved = get_value(state)
                 new_val = float(old_val) + float(resolved)
-                state = self._set_path(state, action.target, new_val)
-                message = f"ADD {resolved!r} to {action.target}: {old_val!r} → {new_val!r}"
+                set_target(state, new_val)
+                if verbose:
+                    message = f"ADD {resolved!r} to {action.target}: {old_val!r} → {new_val!r}"
 
-            elif action.type == ActionType.CLAMP:
-                old_val = self._resolve_path(state, action.target)
+            elif atype == ActionType.CLAMP:
+                old_val = get_target(state)
                 current = float(old_val)
                 if action.min_value is not None and current < action.min_value:
                     new_val = action.min_value
@@ -404,50 +942,29 @@ class RuleEngine:
                     new_val = action.max_value
                 else:
                     new_val = current
-                state = self._set_path(state, action.target, new_val)
-                message = (
-                    f"CLAMP {action.target}: {old_val!r} → {new_val!r} "
-                    f"(min={action.min_value}, max={action.max_value})"
-                )
-
-            elif action.type == ActionType.RECOMMEND:
-                # Does NOT modify state — records a recommendation for educational display
-                old_val = self._resolve_path(state, action.target)
-                resolved = self._resolve_value(state, action.value)
-                new_val = old_val  # unchanged
-                message = (
-                    f"RECOMMEND {action.target} = {resolved!r} "
-                    f"(current: {old_val!r}, not enforced)"
-                )
+                set_target(state, new_val)
+                if verbose:
+                    message = (
+                        f"CLAMP {action.target}: {old_val!r} → {new_val!r} "
+                        f"(min={action.min_value}, max={action.max_value})"
+                    )
 
-            elif action.type == ActionType.SPAWN_EVENT:
+            elif atype == ActionType.SPAWN_EVENT:
                 event_type = action.event_type or ""
                 old_val = state.active_events.get(event_type, False)
-                updated_events = {**state.active_events, event_type: True}
-                state = _copy(state, active_events=updated_events)
+                if old_val is not True:  # re-spawning an active event needs no copy
+                    state.events_for_update()[event_type] = True
                 new_val = True
-                message = f"SPAWN_EVENT: {event_type} activated"
+                if verbose:
+                    message = f"SPAWN_EVENT: {event_type} activated"
                 logger.info("[%s] Event spawned: %s", rule_id, event_type)
 
-            elif action.type == ActionType.TRIGGER_RULE:
-                old_val = None
-                new_val = action.rule_id
-                message = f"TRIGGER_RULE: scheduling {action.rule_id!r}"
-
-            elif action.type == ActionType.LOG:
-                old_val = None
-                new_val = action.log_message
-                level = (action.log_level or "info").lower()
-                log_fn = getattr(logger, level, logger.info)
-                log_fn("[%s] %s", rule_id, action.log_message)
-                message = f"LOG [{level.upper()}]: {action.log_message}"
-
         except Exception as exc:  # noqa: BLE001
             success = False
             message = f"Action failed: {exc}"
             logger.error("Action execution error in rule %s: %s", rule_id, exc)
 
-        return state, ActionApplication(
+        return ActionApplication(
             action=action,
             target_old_value=old_val,
             target_new_value=new_val,
@@ -455,6 +972,67 @@ class RuleEngine:
             message=message,
         )
 
+    def _record_passive_action(
+        self,
+        state: _WorkingState,
+        action: Action,
+        rule_id: str,
+        accessors: Tuple[Getter, Setter, Getter],
+    ) -> ActionApplication:
+        """
+        Record a RECOMMEND / TRIGGER_RULE / LOG action. None of them touch
+        state, so they skip _execute_action's dispatch and error handling;
+        only RECOMMEND reads state, and only that read is guarded.
+        """
+        atype = action.type
+        verbose = self.verbose_explanations
+
+        if atype == ActionType.TRIGGER_RULE:
+            return ActionApplication(
+                action=action,
+                target_old_value=None,
+                target_new_value=action.rule_id,
+                success=True,
+                message=f"TRIGGER_RULE: scheduling {action.rule_id!r}" if verbose else "",
+            )
+
+        if atype == ActionType.LOG:
+            level = (action.log_level or "info").lower()
+            log_fn = getattr(logger, level, logger.info)
+            log_fn("[%s] %s", rule_id, action.log_message)
+            return ActionApplication(
+                action=action,
+                target_old_value=None,
+                target_new_value=action.log_message,
+                success=True,
+                message=f"LOG [{level.upper()}]: {action.log_message}" if verbose else "",
+            )
+
+        # RECOMMEND: records a recommendation for educational display
+        get_target, _, get_value = accessors
+        try:
+            old_val = get_target(state)
+        except Exception as exc:  # noqa: BLE001
+            logger.error("Action execution error in rule %s: %s", rule_id, exc)
+            return ActionApplication(
+                action=action,
+                target_old_value=None,
+                target_new_value=None,
+                success=False,
+                message=f"Action failed: {exc}",
+            )
+        resolved = get_value(state)
+        return ActionApplication(
+            action=action,
+            target_old_value=old_val,
+            target_new_value=old_val,  # unchanged
+            success=True,
+            message=(
+                f"RECOMMEND {action.target} = {resolved!r} "
+                f"(current: {old_val!r}, not enforced)"
+            ) if verbose else "",
+        )
+
     # =========================================================================
     # 5. Conflict Detection & Resolution
     # =========================================================================
@@ -466,11 +1044,13 @@ class RuleEngine:
         Detect cases where multiple triggered rules write to the same field.
         Returns a ConflictRecord for each conflicting target field.
         """
+        if len(triggered) < 2:
+            return []
+
         target_map: Dict[str, List[Rule]] = {}
         for rule, _ in triggered:
-            for action in rule.action:
-                if action.type in (ActionType.SET, ActionType.ADD, ActionType.CLAMP):
-                    target_map.setdefault(action.target, []).append(rule)
+            for target in rule.mutating_targets:
+                target_map.setdefault(target, []).append(rule)
 
         records: List[ConflictRecord] = []
         for target, rules in target_map.items():
@@ -509,134 +1089,9 @@ class RuleEngine:
         return triggered
 
     # =========================================================================
-    # 6. Path Resolution & State Mutation
+    # 6. Template Rendering
     # =========================================================================
 
-    def _resolve_path(self, state: SystemState, path: str) -> Any:
-        """
-        Resolve a dot-notation field path to a value in *state*.
-
-        Supported prefixes
-        ------------------
-        agents.{id}.{field}         → AgentState field
-        environment.{field}         → EnvironmentState field
-        global_metrics.{name}       → float metric
-        events.{event_type}         → bool (True if event is active)
-        """
-        if not isinstance(path, str):
-            return path
-
-        parts = path.split(".")
-
-        if parts[0] == "agents":
-            if len(parts) < 3:
-                raise ValueError(f"Invalid agent path: {path!r}")
-            agent_id, field = parts[1], parts[2]
-            if agent_id not in state.agents:
-                raise KeyError(f"Agent not found: {agent_id!r}")
-            return getattr(state.agents[agent_id], field)
-
-        if parts[0] == "environment":
-            if len(parts) < 2:
-                raise ValueError(f"Invalid environment path: {path!r}")
-            return getattr(state.environment, parts[1])
-
-        if parts[0] == "global_metrics":
-            if len(parts) < 2:
-                raise ValueError(f"Invalid global_metrics path: {path!r}")
-            return state.global_metrics.get(parts[1], 0.0)
-
-        if parts[0] == "events":
-            if len(parts) < 2:
-                raise ValueError(f"Invalid events path: {path!r}")
-            return state.active_events.get(parts[1], False)
-
-        raise ValueError(f"Unknown path prefix in: {path!r}")
-
-    def _set_path(self, state: SystemState, path: str, value: Any) -> SystemState:
-        """Write *value* at dot-notation *path* and return an updated SystemState."""
-        parts = path.split(".")
-
-        if parts[0] == "agents":
-            agent_id, field = parts[1], parts[2]
-            if agent_id not in state.agents:
-                raise KeyError(f"Agent not found: {agent_id!r}")
-            updated_agent = _copy(state.agents[agent_id], **{field: value})
-            updated_agents = {**state.agents, agent_id: updated_agent}
-            return _copy(state, agents=updated_agents)
-
-        if parts[0] == "environment":
-            field = parts[1]
-            updated_env = _copy(state.environment, **{field: value})
-            return _copy(state, environment=updated_env)
-
-        if parts[0] == "global_metrics":
-            metric = parts[1]
-            updated = {**state.global_metrics, metric: float(value)}
-            return _copy(state, global_metrics=updated)
-
-        raise ValueError(f"Cannot set path: {path!r}")
-
-    def _resolve_value(self, state: SystemState, value: Any) -> Any:
-        """
-        Resolve an action value that may be:
-        - A plain scalar    (float, int, str, bool)
-        - A field path      ("agents.tugboat.speed")
-        - A template expr   ("{{agents.cargo_ship.speed + 2.0}}")
-        """
-        if value is None:
-            return None
-
-        if isinstance(value, str):
-            # Template expression: {{ expr }}
-            m = re.fullmatch(r"\{\{(.+)\}\}", value.strip())
-            if m:
-                return self._eval_expr(state, m.group(1).strip())
-
-            # Field path
-            prefix = value.split(".")[0] if "." in value else ""
-            if prefix in ("agents", "environment", "global_metrics", "events"):
-                try:
-                    return self._resolve_path(state, value)
-                except (KeyError, ValueError, AttributeError):
-                    pass  # fall through: treat as literal string
-
-        return value
-
-    def _eval_expr(self, state: SystemState, expr: str) -> Any:
-        """
-        Safely evaluate a template arithmetic expression such as
-        "agents.cargo_ship.speed + 2.0" or "environment.wind_direction + 90".
-
-        Only numeric addition/subtraction/multiplication/division are allowed.
-        """
-        # Replace field paths with their numeric values
-        path_re = re.compile(
-            r"\b("
-            r"agents\.[a-zA-Z_]\w*\.[a-zA-Z_]\w*"
-            r"|environment\.[a-zA-Z_]\w*"
-            r"|global_metrics\.[a-zA-Z_]\w*"
-            r"|events\.[a-zA-Z_]\w*"
-            r")\b"
-        )
-
-        def _sub(match: re.Match) -> str:  # type: ignore[type-arg]
-            try:
-                v = self._resolve_path(state, match.group(0))
-                return str(float(v))
-            except Exception:  # noqa: BLE001
-                return "0.0"
-
-        resolved = path_re.sub(_sub, expr)
-
-        # Restricted eval: only numeric literals and operators
-        try:
-            result = eval(resolved, {"__builtins__": {}}, {})  # noqa: S307
-            return float(result)
-        except Exception as exc:  # noqa: BLE001
-            logger.warning("Template expression eval failed %r: %s", expr, exc)
-            return 0.0
-
     def _render_template(self, state: SystemState, template: str) -> str:
         """
         Render an explanation_template string by substituting {{field.path}}
@@ -648,7 +1103,7 @@ class RuleEngine:
         def _replace(match: re.Match) -> str:  # type: ignore[type-arg]
             expr = match.group(1).strip()
             try:
-                val = self._eval_expr(state, expr)
+                val = _evaluate_expression(state, expr)
                 # Pretty-print: drop ".0" for whole numbers
                 if isinstance(val, float) and val == int(val):
                     return str(int(val))
@@ -656,34 +1111,28 @@ class RuleEngine:
             except Exception:  # noqa: BLE001
                 return match.group(0)
 
-        return re.sub(r"\{\{(.+?)\}\}", _replace, template)
+        return _TEMPLATE_ANY.sub(_replace, template)
 
     # =========================================================================
     # 7. User Input Application
     # =========================================================================
 
     def _apply_user_input(
-        self, state: SystemState, user_input: UserInput
-    ) -> SystemState:
+        self, state: _WorkingState, user_input: UserInput
+    ) -> None:
         """
-        Apply visitor / operator input to state before rule evaluation.
+        Apply visitor / operator input to the working state before rule evaluation.
         Rules then constrain or override these values as appropriate.
         """
         if user_input.target_speed is not None and "tugboat" in state.agents:
-            state = self._set_path(
-                state, "agents.tugboat.speed", user_input.target_speed
-            )
+            state.set_agent_field("tugboat", "speed", user_input.target_speed)
 
         if user_input.target_heading is not None and "tugboat" in state.agents:
-            state = self._set_path(
-                state, "agents.tugboat.heading", user_input.target_heading
-            )
+            state.set_agent_field("tugboat", "heading", user_input.target_heading)
 
         if user_input.emergency_stop:
-            for agent_id in state.agents:
-                state = self._set_path(state, f"agents.{agent_id}.speed", 0.0)
-
-        return state
+            for agent_id in list(state.agents):
+                state.set_agent_field(agent_id, "speed", 0.0)
 
     # =========================================================================
     # 8. Public Utilities
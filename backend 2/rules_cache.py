@@ -0,0 +1,97 @@
+"""
+rules_cache.py
+==============
+On-disk cache of parsed rules files.
+
+Parsing harbor_rules.yaml is the bulk of building a RuleBase. The parsed
+document is stored as JSON next to other harbor caches, keyed by the SHA-256
+of the YAML file's bytes, so an unchanged rules file is never parsed as YAML
+again — not even across restarts. Editing the file changes its hash, so stale
+entries are simply never looked up.
+
+The cache directory is HARBOR_CACHE_DIR, defaulting to ~/.cache/harbor. Any
+failure to read or write it falls back to parsing the YAML. Documents JSON
+cannot hold losslessly (dates, .inf / .nan) are never cached.
+"""
+
+import hashlib
+import logging
+import math
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+import yaml
+
+from rule_engine import RuleBase, _YAML_LOADER
+
+logger = logging.getLogger("RulesCache")
+
+CACHE_DIR = Path(
+    os.environ.get("HARBOR_CACHE_DIR") or Path.home() / ".cache" / "harbor"
+)
+
+
+def load_or_build(rules_path: str, cache_dir: Optional[Path] = None) -> RuleBase:
+    """Build the RuleBase for *rules_path*, reusing a cached parse when the file is unchanged."""
+    path = Path(rules_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Rules file not found: {rules_path}")
+
+    raw = path.read_bytes()
+    cache_file = Path(cache_dir or CACHE_DIR) / f"rules.{hashlib.sha256(raw).hexdigest()}.json"
+
+    try:
+        data = orjson.loads(cache_file.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        data = yaml.load(raw, Loader=_YAML_LOADER)
+        _write_cache(cache_file, data)
+    else:
+        logger.debug("Rules cache hit: %s", cache_file)
+
+    return RuleBase(rules_path, data=data)
+
+
+def _write_cache(cache_file: Path, data: Any) -> None:
+    """Write *data* to *cache_file* atomically (temp file + rename); failures are only logged."""
+    if not _all_finite(data):
+        # orjson writes inf/nan as null, so a warm start would see different rules
+        logger.warning("Rules not cached, document contains non-finite floats")
+        return
+    try:
+        blob = orjson.dumps(data)
+    except TypeError as exc:  # YAML-only types (e.g. dates) have no JSON form
+        logger.warning("Rules not cached, not JSON-serialisable: %s", exc)
+        return
+
+    tmp_name = None
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=cache_file.parent, prefix=".rules.", suffix=".tmp", delete=False
+        ) as tmp:
+            tmp_name = tmp.name
+            tmp.write(blob)
+        os.replace(tmp_name, cache_file)
+        tmp_name = None
+    except OSError as exc:
+        logger.warning("Could not write rules cache %s: %s", cache_file, exc)
+    finally:
+        if tmp_name is not None:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+
+
+def _all_finite(data: Any) -> bool:
+    """True unless a float anywhere in *data* is inf or nan."""
+    if isinstance(data, float):
+        return math.isfinite(data)
+    if isinstance(data, dict):
+        return all(_all_finite(v) for v in data.values())
+    if isinstance(data, list):
+        return all(_all_finite(v) for v in data)
+    return True
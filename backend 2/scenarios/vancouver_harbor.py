@@ -25,16 +25,14 @@ rules_triggered_count   : cumulative rules fired this session
 decision_count          : cumulative automated decisions this session
 """
 
-from models.state import AgentState, EnvironmentState, SystemState
+from functools import lru_cache
+from typing import Any, Callable, Dict
 
+from models.state import AgentState, EnvironmentState, SystemState
 
-def create_initial_state() -> SystemState:
-    """
-    Return the starting SystemState for the Vancouver harbour scenario.
 
-    Call this once at simulation startup; then pass the state into
-    RuleEngine.step() each tick.
-    """
+def _build_initial_state() -> SystemState:
+    """Build the starting SystemState for the Vancouver harbour scenario."""
     tugboat = AgentState(
         id="tugboat",
         type="tugboat",
@@ -83,15 +81,100 @@ def create_initial_state() -> SystemState:
         },
         environment=environment,
         global_metrics=global_metrics,
-        active_events={},
-        time_step=0,
-        history=[],
+        # active_events, time_step and history start at the field defaults
     )
 
 
 # ---------------------------------------------------------------------------
 # Pre-built scenario variants (for museum exhibit mode selection)
 # ---------------------------------------------------------------------------
+# Each variant is the default scenario's dump with its changes merged in,
+# validated into a SystemState in a single constructor call.
+
+def _build_fog_scenario() -> SystemState:
+    """Fog scenario: low visibility in the harbour entry."""
+    base = _template("default")
+    return SystemState(
+        agents=base["agents"],
+        # Drop visibility to trigger fog rules
+        environment={**base["environment"], "visibility": 0.2, "zone": "harbour_entry"},
+        global_metrics=base["global_metrics"],
+    )
+
+
+def _build_docking_scenario() -> SystemState:
+    """Docking scenario: tugboat close to the berth at the wrong heading."""
+    base = _template("default")
+    return SystemState(
+        agents={
+            **base["agents"],
+            # Give the tugboat some speed so the stop rules fire
+            "tugboat": {**base["agents"]["tugboat"], "speed": 4.0, "heading": 65.0},
+        },
+        environment={**base["environment"], "zone": "docking_zone", "berth_heading": 0.0},
+        global_metrics={
+            **base["global_metrics"],
+            "heading_error": 25.0,    # 25° misaligned — will trigger alignment rule
+            "distance_to_berth": 3.0, # 3 m from berth — will trigger final stop
+        },
+    )
+
+
+def _build_emergency_scenario() -> SystemState:
+    """Engine failure scenario: engine down with the tugboat under way."""
+    base = _template("default")
+    return SystemState(
+        agents={
+            **base["agents"],
+            "tugboat": {**base["agents"]["tugboat"], "speed": 10.0},
+        },
+        environment=base["environment"],
+        global_metrics={
+            **base["global_metrics"],
+            "engine_status": 0.0,  # engine is down
+        },
+    )
+
+
+# ---------------------------------------------------------------------------
+# Scenario templates
+# ---------------------------------------------------------------------------
+# Each scenario is built once, on first use, and kept as a plain dump. Handing
+# out SystemState.model_validate(template) is cheaper than re-running the
+# builder (one validation pass instead of several model constructions and
+# copies), and validation copies every container, so each caller owns a state
+# it is free to mutate.
+#
+# model_construct() is deliberately not used for these copies: it skips the
+# copying, so every agent, dict and the history deque would have to be copied
+# by hand (measured slower than this one validation pass), and it would also
+# skip the history ring-buffer and string-interning validators.
+
+_BUILDERS: Dict[str, Callable[[], SystemState]] = {
+    "default":   _build_initial_state,
+    "fog":       _build_fog_scenario,
+    "docking":   _build_docking_scenario,
+    "emergency": _build_emergency_scenario,
+}
+
+
+@lru_cache(maxsize=None)
+def _template(name: str) -> Dict[str, Any]:
+    # Fields at their defaults (no events, step 0, empty history) are left
+    # out, so each copy gets them straight from the default factories
+    # instead of validating and re-wrapping an empty list into the deque
+    return _BUILDERS[name]().model_dump(exclude={"history"}, exclude_defaults=True)
+
+
+def create_initial_state() -> SystemState:
+    """
+    Return the starting SystemState for the Vancouver harbour scenario.
+
+    Call this once at simulation startup; then pass the state into
+    RuleEngine.step() each tick.
+    """
+    return SystemState.model_validate(_template("default"))
+
 
 def create_fog_scenario() -> SystemState:
     """
@@ -99,13 +182,7 @@ def create_fog_scenario() -> SystemState:
     Demonstrates rules: low_visibility_speed_reduction, fog_event_response,
                         request_harbour_guidance.
     """
-    state = create_initial_state()
-    # Drop visibility to trigger fog rules
-    from models.state import EnvironmentState
-    updated_env = state.environment.model_copy(
-        update={"visibility": 0.2, "zone": "harbour_entry"}
-    )
-    return state.model_copy(update={"environment": updated_env})
+    return SystemState.model_validate(_template("fog"))
 
 
 def create_docking_scenario() -> SystemState:
@@ -114,26 +191,7 @@ def create_docking_scenario() -> SystemState:
     Demonstrates rules: docking_approach_speed, docking_heading_alignment,
                         docking_final_stop.
     """
-    state = create_initial_state()
-    updated_env = state.environment.model_copy(
-        update={"zone": "docking_zone", "berth_heading": 0.0}
-    )
-    updated_metrics = {
-        **state.global_metrics,
-        "heading_error": 25.0,    # 25° misaligned — will trigger alignment rule
-        "distance_to_berth": 3.0, # 3 m from berth — will trigger final stop
-    }
-    # Give the tugboat some speed so the stop rules fire
-    updated_tugboat = state.agents["tugboat"].model_copy(
-        update={"speed": 4.0, "heading": 65.0}
-    )
-    return state.model_copy(
-        update={
-            "environment": updated_env,
-            "global_metrics": updated_metrics,
-            "agents": {**state.agents, "tugboat": updated_tugboat},
-        }
-    )
+    return SystemState.model_validate(_template("docking"))
 
 
 def create_emergency_scenario() -> SystemState:
@@ -141,15 +199,4 @@ def create_emergency_scenario() -> SystemState:
     Engine failure scenario: demonstrates multi-step rule chaining.
     engine_failure_detection → emergency_anchor (via trigger_rule + event).
     """
-    state = create_initial_state()
-    updated_metrics = {
-        **state.global_metrics,
-        "engine_status": 0.0,  # engine is down
-    }
-    updated_tugboat = state.agents["tugboat"].model_copy(update={"speed": 10.0})
-    return state.model_copy(
-        update={
-            "global_metrics": updated_metrics,
-            "agents": {**state.agents, "tugboat": updated_tugboat},
-        }
-    )
+    return SystemState.model_validate(_template("emergency"))
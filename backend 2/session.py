@@ -8,73 +8,268 @@ Multiple sessions can coexist (e.g. multiple exhibit terminals).
 
 Each session holds:
   - its own SystemState          (so visitors don't interfere)
-  - its own RuleEngine instance  (same rules, isolated state)
+  - the shared RuleEngine        (stateless: rules only, no session state)
   - a scenario name              (which variant was loaded)
+
+Visitors often walk away without ending their session, so the store is
+bounded: at most max_size sessions are kept (least recently used dropped
+first) and sessions idle for longer than ttl_seconds expire. Both default to
+MAX_SESSIONS / SESSION_TTL_SECONDS.
 """
 
-import uuid
+import asyncio
+import importlib
+import os
+import time
 import logging
-from typing import Dict, Optional
+import threading
+import yaml
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 
-from models.state import SystemState
+from models.state import StateSnapshot, SystemState
+import fastuuid
 from rule_engine import RuleEngine
-from scenarios.vancouver_harbor import (
-    create_initial_state,
-    create_fog_scenario,
-    create_docking_scenario,
-    create_emergency_scenario,
-)
+from rules_cache import load_or_build
 
 logger = logging.getLogger("Session")
+# Level for session lifecycle logs (create / reset / evict), e.g. WARNING to
+# silence them on busy kiosks
+_log_level = os.getenv("SESSION_LOG_LEVEL", "").strip().upper()
+if _log_level:
+    if isinstance(logging.getLevelName(_log_level), int):
+        logger.setLevel(_log_level)
+    else:
+        logger.warning(
+            "Ignoring SESSION_LOG_LEVEL=%r: not a logging level name", _log_level
+        )
 
-SCENARIO_FACTORIES = {
-    "default":   create_initial_state,
-    "fog":       create_fog_scenario,
-    "docking":   create_docking_scenario,
-    "emergency": create_emergency_scenario,
+# The rule engine parses with libyaml's CSafeLoader when PyYAML has it
+if not hasattr(yaml, "CSafeLoader"):
+    logger.warning(
+        "PyYAML was built without libyaml; rules will be parsed with the "
+        "pure-Python SafeLoader. Install libyaml and reinstall PyYAML for "
+        "faster rule loading."
+    )
+
+# "module:function" of each scenario's state factory, imported on first use
+SCENARIO_FACTORIES: Dict[str, str] = {
+    "default":   "scenarios.vancouver_harbor:create_initial_state",
+    "fog":       "scenarios.vancouver_harbor:create_fog_scenario",
+    "docking":   "scenarios.vancouver_harbor:create_docking_scenario",
+    "emergency": "scenarios.vancouver_harbor:create_emergency_scenario",
 }
 
 RULES_PATH = "rules/harbor_rules.yaml"
 
+# Rules are compiled once per process, on the first create(), into a
+# read-only RuleBase (the YAML parse itself is cached on disk by rules_cache).
+# RuleEngine keeps no per-session state (step() takes the state and returns
+# the next one), so a single engine on that RuleBase serves every session.
+_ENGINE: Optional[RuleEngine] = None
+
+
+def _get_engine() -> RuleEngine:
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = RuleEngine.from_shared(load_or_build(RULES_PATH))
+    return _ENGINE
+
+
+# Compiled pydantic-core serializers, called directly on the per-tick dump
+# path (skips BaseModel.model_dump's argument plumbing)
+_STATE_SERIALIZER = SystemState.__pydantic_serializer__
+_SNAPSHOT_SERIALIZER = StateSnapshot.__pydantic_serializer__
+
+# id(snapshot) -> (snapshot, its dump); holding the snapshot keeps its id unique
+SnapshotMemo = Dict[int, Tuple[StateSnapshot, Dict[str, Any]]]
 
-@dataclass
+MAX_SESSIONS = 1000
+SESSION_TTL_SECONDS = 3600.0
+SESSION_SHARDS = 16  # power of two: shard index is a bit mask of the hash
+
+
+@lru_cache(maxsize=None)
+def resolve_scenario(scenario: str) -> Callable[[], SystemState]:
+    """Import and return the state factory registered for *scenario* (KeyError if unknown)."""
+    module_name, func_name = SCENARIO_FACTORIES[scenario].split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+@dataclass(slots=True)
 class Session:
     session_id: str
     scenario: str
     engine: RuleEngine
     state: SystemState
+    last_access: float = field(default_factory=time.monotonic)
+    # Serialises state changes within this session; other sessions never wait
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
+
+    # Serialisation cache for the current state minus its history. The engine
+    # returns a new SystemState every tick (and start/reset assign a fresh
+    # one), so the dump stays valid for as long as the same state object at
+    # the same time_step is current. History is dumped on demand instead of
+    # being kept per snapshot: that would be up to HISTORY_LIMIT dicts per
+    # session.
+    _state_dump: Optional[Tuple[SystemState, int, Dict[str, Any]]] = field(
+        default=None, init=False, repr=False
+    )
+
+    def state_dump(self, memo: Optional[SnapshotMemo] = None) -> Dict[str, Any]:
+        """
+        JSON-ready dump of the current state, including its history.
+
+        Calls sharing one *memo* (e.g. before and after a tick) dump each
+        history snapshot only once between them.
+        """
+        state = self.state
+        cached = self._state_dump
+        if cached is None or cached[0] is not state or cached[1] != state.time_step:
+            head = _STATE_SERIALIZER.to_python(state, mode="json", exclude={"history"})
+            cached = self._state_dump = (state, state.time_step, head)
+
+        dump = dict(cached[2])
+        dump["history"] = self.history_dump(memo=memo)
+        return dump
+
+    def history_since(self, since: Optional[int] = None) -> List[StateSnapshot]:
+        """
+        The snapshots in state.history, optionally only those taken after
+        time step *since*. Snapshots are frozen, so the list stays safe to
+        read after the session lock is released.
+        """
+        history = self.state.history
+        if since is None:
+            return list(history)
+        recent: List[StateSnapshot] = []
+        for snapshot in reversed(history):
+            if snapshot.timestamp <= since:
+                break
+            recent.append(snapshot)
+        recent.reverse()
+        return recent
+
+    def history_dump(
+        self, since: Optional[int] = None, memo: Optional[SnapshotMemo] = None
+    ) -> List[Dict[str, Any]]:
+        """JSON-ready dumps of history_since(*since*), reusing any in *memo*."""
+        snapshots = self.history_since(since)
+        if memo is None:
+            return [_SNAPSHOT_SERIALIZER.to_python(s, mode="json") for s in snapshots]
+
+        dumps: List[Dict[str, Any]] = []
+        for snapshot in snapshots:
+            entry = memo.get(id(snapshot))
+            if entry is None:
+                entry = memo[id(snapshot)] = (
+                    snapshot,
+                    _SNAPSHOT_SERIALIZER.to_python(snapshot, mode="json"),
+                )
+            dumps.append(entry[1])
+        return dumps
 
 
 class SessionManager:
-    """Thread-safe (single-threaded FastAPI) session store."""
+    """
+    Session store with LRU + TTL eviction.
 
-    def __init__(self) -> None:
-        self._sessions: Dict[str, Session] = {}
+    Sessions are split across SESSION_SHARDS small dicts by session_id hash.
+    Each shard is kept in least-recently-used order: every lookup moves the
+    session to the end of its shard, so the globally least recently used
+    session is always at the front of one of the shards.
+
+    Each shard has its own threading.Lock, held only around the dict
+    operations on that shard, so the store may also be used from worker
+    threads (sync endpoints, asyncio.to_thread). Anything that adds or
+    removes sessions also holds the store-wide _size_lock (always taken
+    before a shard lock), so create()'s capacity check and LRU eviction see
+    a count nobody else can change. Lookups that only touch LRU order need
+    just their shard lock. Building a session's state happens outside any
+    lock.
+    """
+
+    def __init__(
+        self,
+        max_size: int = MAX_SESSIONS,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, got {max_size}")
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._shards: List["OrderedDict[str, Session]"] = [
+            OrderedDict() for _ in range(SESSION_SHARDS)
+        ]
+        self._locks: List[threading.Lock] = [
+            threading.Lock() for _ in range(SESSION_SHARDS)
+        ]
+        # Held around every insert/removal, before any shard lock
+        self._size_lock = threading.Lock()
+        # Per shard, updated under that shard's lock
+        self._evicted: List[int] = [0] * SESSION_SHARDS
+
+    def _slot(self, session_id: str) -> int:
+        return hash(session_id) & (SESSION_SHARDS - 1)
 
     # ------------------------------------------------------------------
     def create(self, scenario: str = "default") -> Session:
-        if scenario not in SCENARIO_FACTORIES:
+        try:
+            factory = resolve_scenario(scenario)
+        except KeyError:
             raise ValueError(
                 f"Unknown scenario {scenario!r}. "
                 f"Available: {list(SCENARIO_FACTORIES)}"
-            )
-        session_id = str(uuid.uuid4())
-        engine = RuleEngine(RULES_PATH)
-        state = SCENARIO_FACTORIES[scenario]()
+            ) from None
+        session_id = fastuuid.new_str()
+        engine = _get_engine()
+        state = factory()
         session = Session(
             session_id=session_id,
             scenario=scenario,
             engine=engine,
             state=state,
         )
-        self._sessions[session_id] = session
+        slot = self._slot(session_id)
+        with self._size_lock:
+            with self._locks[slot]:
+                self._shards[slot][session_id] = session
+            while self.active_count > self.max_size:
+                self._evict_lru("capacity")
         logger.info("Created session %s (scenario=%s)", session_id, scenario)
         return session
 
     # ------------------------------------------------------------------
     def get(self, session_id: str) -> Optional[Session]:
-        return self._sessions.get(session_id)
+        slot = self._slot(session_id)
+        shard = self._shards[slot]
+        with self._locks[slot]:
+            session = shard.get(session_id)
+            if session is None:
+                return None
+
+            now = time.monotonic()
+            if now - session.last_access <= self.ttl_seconds:
+                session.last_access = now
+                shard.move_to_end(session_id)
+                return session
+
+        # Expired but not yet swept; removing it needs the size lock, which
+        # ranks before the shard lock, so re-check once both are held
+        with self._size_lock, self._locks[slot]:
+            if shard.get(session_id) is session and (
+                time.monotonic() - session.last_access > self.ttl_seconds
+            ):
+                del shard[session_id]
+                self._evicted[slot] += 1
+                evicted = True
+            else:
+                evicted = False
+        if evicted:
+            logger.info("Evicted session %s (expired)", session_id)
+        return None
 
     def require(self, session_id: str) -> Session:
         session = self.get(session_id)
@@ -85,14 +280,60 @@ class SessionManager:
     # ------------------------------------------------------------------
     def reset(self, session_id: str) -> Session:
         session = self.require(session_id)
-        session.state = SCENARIO_FACTORIES[session.scenario]()
+        session.state = resolve_scenario(session.scenario)()
         logger.info("Reset session %s", session_id)
         return session
 
     def delete(self, session_id: str) -> None:
-        self._sessions.pop(session_id, None)
+        slot = self._slot(session_id)
+        with self._size_lock, self._locks[slot]:
+            self._shards[slot].pop(session_id, None)
+
+    # ------------------------------------------------------------------
+    def evict_expired(self) -> int:
+        """Drop every session idle for longer than ttl_seconds."""
+        deadline = time.monotonic() - self.ttl_seconds
+        evicted: List[str] = []
+        with self._size_lock:
+            for slot, shard in enumerate(self._shards):
+                with self._locks[slot]:
+                    # LRU order: the first non-expired session ends the shard's scan
+                    while shard:
+                        session_id, session = next(iter(shard.items()))
+                        if session.last_access > deadline:
+                            break
+                        del shard[session_id]
+                        self._evicted[slot] += 1
+                        evicted.append(session_id)
+        if evicted and logger.isEnabledFor(logging.INFO):
+            for session_id in evicted:
+                logger.info("Evicted session %s (expired)", session_id)
+        return len(evicted)
+
+    def _evict_lru(self, reason: str) -> None:
+        # Caller holds _size_lock, so no shard can gain or lose sessions here.
+        # The oldest session overall is the oldest of the shard heads.
+        oldest_slot = None
+        oldest_access = 0.0
+        for slot, shard in enumerate(self._shards):
+            with self._locks[slot]:
+                if shard:
+                    last_access = next(iter(shard.values())).last_access
+                    if oldest_slot is None or last_access < oldest_access:
+                        oldest_slot, oldest_access = slot, last_access
+        if oldest_slot is None:
+            return
+
+        with self._locks[oldest_slot]:
+            session_id, _ = self._shards[oldest_slot].popitem(last=False)
+            self._evicted[oldest_slot] += 1
+        logger.info("Evicted session %s (%s)", session_id, reason)
 
     # ------------------------------------------------------------------
     @property
     def active_count(self) -> int:
-        return len(self._sessions)
+        return sum(len(shard) for shard in self._shards)
+
+    @property
+    def evicted_count(self) -> int:
+        return sum(self._evicted)
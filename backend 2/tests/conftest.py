@@ -0,0 +1,11 @@
+import pytest
+
+import rules_cache
+
+
+@pytest.fixture(autouse=True)
+def _isolated_rules_cache(monkeypatch, tmp_path):
+    # Keep the on-disk rules cache out of the user's ~/.cache/harbor
+    cache_dir = tmp_path / "harbor-cache"
+    monkeypatch.setenv("HARBOR_CACHE_DIR", str(cache_dir))
+    monkeypatch.setattr(rules_cache, "CACHE_DIR", cache_dir)
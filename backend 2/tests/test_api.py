@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+
+import httpx
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    # RULES_PATH is relative to the backend directory
+    monkeypatch.chdir(os.path.join(os.path.dirname(__file__), ".."))
+    monkeypatch.setattr(api, "DECISION_LOG_FILE", tmp_path / "decision_log.jsonl")
+    with TestClient(api.app) as c:
+        yield c
+
+
+def _create(client, scenario="default"):
+    r = client.post("/sessions", json={"scenario": scenario})
+    assert r.status_code == 200
+    return r.json()["session_id"]
+
+
+def test_step_returns_state_and_explanations_and_logs(client):
+    session_id = _create(client, "fog")
+
+    r = client.post(f"/sessions/{session_id}/step", json={"target_speed": 9.0})
+    assert r.status_code == 200
+    body = r.json()
+
+    assert body["time_step"] == 1
+    assert body["state"]["time_step"] == 1
+    assert body["rules_triggered"] == [e["rule_id"] for e in body["explanations"]]
+    first = body["explanations"][0]
+    assert "\n" not in first["message"]
+    assert first["conditions"][0]["operator"] in ("<", ">", "<=", ">=", "==", "in")
+
+    lines = api.DECISION_LOG_FILE.read_text(encoding="utf-8").splitlines()
+    record = json.loads(lines[-1])
+    assert record["session_id"] == session_id
+    assert record["state_before"]["time_step"] == 0
+    assert record["explanations"] == body["explanations"]
+
+
+def test_history_since_returns_only_newer_snapshots(client):
+    session_id = _create(client)
+    for _ in range(3):
+        client.post(f"/sessions/{session_id}/step", json={})
+
+    full = client.get(f"/sessions/{session_id}/history").json()
+    assert full["total_steps"] == 3
+    assert [s["timestamp"] for s in full["snapshots"]] == [1, 2, 3]
+
+    recent = client.get(f"/sessions/{session_id}/history", params={"since": 2}).json()
+    assert [s["timestamp"] for s in recent["snapshots"]] == [3]
+
+
+def test_concurrent_steps_on_one_session_are_serialised(client):
+    session_id = _create(client)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(
+                *(ac.post(f"/sessions/{session_id}/step", json={}) for _ in range(5))
+            )
+
+    responses = asyncio.run(burst())
+    assert sorted(r.json()["time_step"] for r in responses) == [1, 2, 3, 4, 5]
+    assert client.get(f"/sessions/{session_id}/state").json()["time_step"] == 5
+
+
+def test_unknown_session_is_404(client):
+    assert client.get("/sessions/missing/state").status_code == 404
+    assert client.post("/sessions/missing/step", json={}).status_code == 404
+
+
+def test_base_http_middleware_is_rejected_at_startup():
+    from fastapi import FastAPI
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    class Timing(BaseHTTPMiddleware):
+        async def dispatch(self, request, call_next):
+            return await call_next(request)
+
+    app = FastAPI()
+    app.add_middleware(Timing)
+    with pytest.raises(RuntimeError, match="pure ASGI"):
+        api._check_middleware(app)
+    api._check_middleware(api.app)
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("already clean", "already clean"),
+        (" padded\ttext \n", "padded text"),
+        ("a\x0cb\xa0c d\x1ce", "a b c d e"),
+    ],
+)
+def test_clean_collapses_every_whitespace_character(text, expected):
+    assert api._clean(text) == expected
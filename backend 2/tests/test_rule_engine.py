@@ -0,0 +1,121 @@
+import os
+
+import pytest
+
+from rule_engine import RuleEngine, _evaluate_expression
+from scenarios.vancouver_harbor import create_initial_state
+
+
+@pytest.fixture
+def engine():
+    rules_path = os.path.join(os.path.dirname(__file__), "..", "rules", "harbor_rules.yaml")
+    return RuleEngine(os.path.abspath(rules_path))
+
+
+def test_template_expressions_resolve_paths():
+    state = create_initial_state()
+    direction = state.environment.wind_direction
+    speed = state.agents["tugboat"].speed
+
+    assert _evaluate_expression(state, "environment.wind_direction + 90") == direction + 90
+    assert _evaluate_expression(state, "agents.tugboat.speed * agents.tugboat.speed") == speed * speed
+    assert _evaluate_expression(state, "-(agents.tugboat.speed - 1) / 2") == -(speed - 1) / 2
+
+
+@pytest.mark.parametrize(
+    "expr",
+    ["__import__('os').getcwd()", "agents.tugboat.speed.__class__", "unknown + 1", "'a' * 3", "1 +"],
+)
+def test_template_expressions_reject_non_arithmetic(expr):
+    assert _evaluate_expression(create_initial_state(), expr) == 0.0
+
+
+def test_step_leaves_the_input_state_untouched_but_hands_on_history(engine):
+    from models.input import UserInput
+    from scenarios.vancouver_harbor import create_fog_scenario
+
+    state = create_fog_scenario()
+    before = state.model_dump(exclude={"history"})
+
+    new_state, explanations = engine.step(state, UserInput(target_speed=9.0))
+
+    assert explanations
+    assert state.model_dump(exclude={"history"}) == before
+    assert new_state.time_step == state.time_step + 1
+    assert new_state.agents["tugboat"] is not state.agents["tugboat"]
+    # The history ring buffer is handed on, not copied
+    assert new_state.history is state.history
+    assert new_state.history[-1].timestamp == new_state.time_step
+
+
+def test_chained_rules_record_the_rule_that_triggered_them(engine):
+    from scenarios.vancouver_harbor import create_emergency_scenario
+
+    _, explanations = engine.step(create_emergency_scenario())
+
+    by_id = {e.rule_id: e for e in explanations}
+    chained = [e for e in explanations if e.triggered_by is not None]
+    assert chained
+    for e in chained:
+        assert e.rule_id in by_id[e.triggered_by].triggered_rules
+
+
+def test_quiet_explanations_skip_record_messages_only(engine):
+    from models.input import UserInput
+    from scenarios.vancouver_harbor import create_fog_scenario
+
+    quiet = RuleEngine(engine.rules_path, verbose_explanations=False)
+    loud_state, loud = engine.step(create_fog_scenario(), UserInput(target_speed=9.0))
+    quiet_state, silent = quiet.step(create_fog_scenario(), UserInput(target_speed=9.0))
+
+    assert quiet_state.model_dump(exclude={"history"}) == loud_state.model_dump(exclude={"history"})
+    assert [e.rule_id for e in silent] == [e.rule_id for e in loud]
+    for exp in silent:
+        assert exp.message
+        assert all(ce.message == "" for ce in exp.conditions_evaluated)
+        assert all(aa.message == "" for aa in exp.actions_applied if aa.success)
+
+
+def test_step_keeps_nothing_on_the_engine(engine):
+    from scenarios.vancouver_harbor import create_emergency_scenario
+
+    attrs = {name: (value, len(value) if hasattr(value, "__len__") else None)
+             for name, value in vars(engine).items()}
+    rulebase_tables = {name: dict(value) for name, value in vars(engine.rulebase).items()
+                       if isinstance(value, dict)}
+
+    state = create_emergency_scenario()
+    for _ in range(3):
+        state, _ = engine.step(state)
+
+    assert vars(engine).keys() == attrs.keys()
+    for name, (value, size) in attrs.items():
+        assert getattr(engine, name) is value
+        assert size is None or len(value) == size
+    for name, table in rulebase_tables.items():
+        assert getattr(engine.rulebase, name) == table
+
+
+def test_quiet_tick_shares_global_metrics(engine):
+    state = create_initial_state()
+
+    new_state, explanations = engine.step(state)
+
+    assert explanations == []
+    assert new_state.global_metrics is state.global_metrics
+    assert new_state.time_step == state.time_step + 1
+
+
+@pytest.mark.parametrize("scenario", ["default", "fog", "docking", "emergency"])
+def test_zone_prefilter_matches_evaluating_every_rule(engine, scenario):
+    from session import resolve_scenario
+
+    full = RuleEngine.from_shared(engine.rulebase)
+    full._rules_by_zone, full._ungated_rules = {}, full.rules
+
+    state, expected = resolve_scenario(scenario)(), resolve_scenario(scenario)()
+    for _ in range(5):
+        state, explanations = engine.step(state)
+        expected, expected_explanations = full.step(expected)
+        assert [e.model_dump() for e in explanations] == [e.model_dump() for e in expected_explanations]
+        assert state.model_dump(exclude={"history"}) == expected.model_dump(exclude={"history"})
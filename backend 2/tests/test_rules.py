@@ -91,3 +91,17 @@ def test_emergency_scenario_triggers_engine_failure_logic():
     assert explanation is not None
     # engine_status was set to 0 in scenario; a safety/emergency rule should fire
     assert new_state.global_metrics["engine_status"] == 0.0
+
+
+def test_snapshots_are_not_changed_by_later_in_place_updates():
+    eng = _engine()
+    state = create_emergency_scenario()
+    new_state, _ = eng.step(state)
+    snapshot = new_state.history[-1]
+    metrics_at_snapshot = dict(snapshot.global_metrics)
+    events_at_snapshot = dict(snapshot.active_events)
+
+    new_state, _ = eng.step(new_state)
+
+    assert snapshot.global_metrics == metrics_at_snapshot
+    assert snapshot.active_events == events_at_snapshot
@@ -0,0 +1,42 @@
+import os
+
+from rule_engine import RuleBase
+from rules_cache import load_or_build
+
+RULES_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "rules", "harbor_rules.yaml")
+)
+
+
+def test_cached_rules_match_a_fresh_parse(tmp_path):
+    built = load_or_build(RULES_PATH, cache_dir=tmp_path)
+    cache_files = list(tmp_path.glob("rules.*.json"))
+    assert len(cache_files) == 1
+
+    cached = load_or_build(RULES_PATH, cache_dir=tmp_path)
+    fresh = RuleBase(RULES_PATH)
+
+    assert [r.model_dump() for r in built.rules] == [r.model_dump() for r in fresh.rules]
+    assert [r.model_dump() for r in cached.rules] == [r.model_dump() for r in fresh.rules]
+    assert list(tmp_path.iterdir()) == cache_files
+
+
+def test_edited_rules_file_misses_the_cache(tmp_path):
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_bytes(open(RULES_PATH, "rb").read())
+    cache_dir = tmp_path / "cache"
+
+    load_or_build(str(rules_file), cache_dir=cache_dir)
+    rules_file.write_text("rules: []\n")
+
+    assert load_or_build(str(rules_file), cache_dir=cache_dir).rules == ()
+    assert len(list(cache_dir.glob("rules.*.json"))) == 2
+
+
+def test_non_finite_floats_are_not_cached(tmp_path):
+    rules_file = tmp_path / "rules.yaml"
+    rules_file.write_text("rules: []\nlimits: {max_speed: .inf, min_speed: .nan}\n")
+    cache_dir = tmp_path / "cache"
+
+    assert load_or_build(str(rules_file), cache_dir=cache_dir).rules == ()
+    assert not list(cache_dir.glob("rules.*.json"))
@@ -0,0 +1,155 @@
+import os
+
+import pytest
+
+from models.input import UserInput
+from models.state import HISTORY_LIMIT
+from session import SessionManager
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    # RULES_PATH is relative to the backend directory
+    monkeypatch.chdir(os.path.join(os.path.dirname(__file__), ".."))
+    return SessionManager()
+
+
+def test_state_dump_follows_state_changes(manager):
+    session = manager.create("emergency")
+
+    dump = session.state_dump()
+    assert dump == session.state.model_dump(mode="json")
+    assert session.state_dump() == dump
+
+    session.state, _ = session.engine.step(session.state, UserInput(target_speed=5.0))
+
+    new_dump = session.state_dump()
+    assert new_dump != dump
+    assert new_dump == session.state.model_dump(mode="json")
+
+
+def test_state_dumps_sharing_a_memo_dump_each_snapshot_once(manager):
+    session = manager.create("fog")
+    for _ in range(3):
+        session.state, _ = session.engine.step(session.state)
+
+    memo = {}
+    before = session.state_dump(memo)
+    session.state, _ = session.engine.step(session.state)
+    after = session.state_dump(memo)
+
+    assert after == session.state.model_dump(mode="json")
+    assert all(a is b for a, b in zip(before["history"], after["history"]))
+    assert len(memo) == 4
+
+
+def test_history_dump_follows_appends_and_reset(manager):
+    session = manager.create("fog")
+    for _ in range(3):
+        session.state, _ = session.engine.step(session.state)
+
+    assert session.history_dump() == [s.model_dump(mode="json") for s in session.state.history]
+
+    manager.reset(session.session_id)
+    assert session.history_dump() == []
+
+
+def test_history_is_bounded_and_filterable(manager):
+    session = manager.create("default")
+    for _ in range(HISTORY_LIMIT + 5):
+        session.state, _ = session.engine.step(session.state)
+
+    history = session.state.history
+    assert len(history) == HISTORY_LIMIT
+    assert history[-1].timestamp == HISTORY_LIMIT + 5
+
+    dumps = session.history_dump()
+    assert dumps == [s.model_dump(mode="json") for s in history]
+
+    recent = session.history_dump(since=HISTORY_LIMIT + 2)
+    assert [d["timestamp"] for d in recent] == [HISTORY_LIMIT + 3, HISTORY_LIMIT + 4, HISTORY_LIMIT + 5]
+
+
+def test_lru_capacity_evicts_least_recently_used(manager):
+    manager.max_size = 2
+    first = manager.create()
+    second = manager.create()
+    manager.require(first.session_id)  # first is now most recently used
+
+    manager.create()
+
+    assert manager.get(second.session_id) is None
+    assert manager.get(first.session_id) is first
+    assert manager.active_count == 2
+    assert manager.evicted_count == 1
+
+
+def test_idle_sessions_expire(manager):
+    session = manager.create()
+    manager.ttl_seconds = -1.0
+
+    assert manager.evict_expired() == 1
+    assert manager.get(session.session_id) is None
+    assert manager.evicted_count == 1
+
+
+def test_sessions_share_one_engine(manager):
+    first = manager.create("fog")
+    second = manager.create("docking")
+
+    assert first.engine is second.engine
+    second.state, _ = second.engine.step(second.state)
+    assert first.state.time_step == 0
+
+
+def test_scenario_states_are_independent_copies(manager):
+    first = manager.create("docking")
+    first.state.agents["tugboat"].speed = 0.0
+    first.state.agents["cargo_ship"].metadata["tonnage"] = 1
+    first.state.global_metrics["heading_error"] = 0.0
+
+    second = manager.create("docking")
+    assert second.state.agents["tugboat"].speed == 4.0
+    assert second.state.agents["cargo_ship"].metadata["tonnage"] == 12000
+    assert second.state.global_metrics["heading_error"] == 25.0
+    assert second.state.history is not first.state.history
+
+
+def test_session_ids_are_canonical_uuid4_strings(manager):
+    import uuid
+
+    ids = [manager.create().session_id for _ in range(300)]  # spans a pool refill
+
+    assert len(set(ids)) == len(ids)
+    for session_id in ids:
+        parsed = uuid.UUID(session_id)
+        assert str(parsed) == session_id
+        assert parsed.version == 4
+        assert parsed.variant == uuid.RFC_4122
+
+
+def test_store_is_safe_to_use_from_threads(manager):
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    manager.max_size = 50
+    # Switch threads as often as possible to shake out check-then-act races
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+
+    def churn(_):
+        for _ in range(20):
+            session = manager.create()
+            manager.get(session.session_id)
+            manager.delete(session.session_id)
+            manager.create()
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(churn, range(8)))
+    finally:
+        sys.setswitchinterval(interval)
+
+    # 320 creates, at most 160 deletes: the rest went to capacity eviction
+    assert manager.active_count == 50
+    assert manager.evicted_count >= 8 * 20 - 50